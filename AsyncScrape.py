@@ -0,0 +1,219 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import aiohttp
+from HttpScrape import BASE_URL, USER_AGENT, category_url, resolve_category_ids, save_page, team_url
+from ScrapeCommon import new_summary, parse_table_4
+from ScrapeManifest import count_games, is_team_current, write_table
+import Telemetry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def error_text(e):
+    # Short error text for the log and the journal; timeouts have an empty message, so the type is included
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+def parse_retry_after(value):
+    # Seconds to wait from a Retry-After header (delay seconds or an HTTP date); None when absent or invalid
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: allows `burst` requests at once, refilled at `rate` tokens per second."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimitedClient:
+    # Shared by every task: one bucket per host, one global concurrency cap, per-request timeouts
+    def __init__(self, session, rate, burst, concurrency, retries=3, backoff=1.0, cache=None, replay=False):
+        self.session = session
+        self.cache = cache
+        self.replay = replay
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.request_count = 0
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def fetch(self, url, team=None, category=None, metrics=None):
+        # Read through the page cache when one is given; replay mode never touches the network. Requests sent
+        # (retries included) are counted on `metrics` (a Telemetry unit) when given
+        entry = None
+        if self.cache is not None:
+            html, entry = self.cache.lookup(url, team, category, replay=self.replay)
+            if html is not None:
+                return html
+        headers = self.cache.conditional_headers(entry) if self.cache is not None else {}
+
+        for attempt in range(self.retries + 1):
+            await self.bucket_for(url).acquire()
+            retry_after = None
+            try:
+                async with self.semaphore:
+                    self.request_count += 1
+                    if metrics is not None:
+                        metrics.add(requests=1)
+                    async with self.session.get(url, headers=headers) as response:
+                        if response.status == 304:
+                            if entry is None:
+                                # Nothing was cached to revalidate, so the empty body is not the page
+                                raise aiohttp.ClientResponseError(
+                                    response.request_info, response.history, status=304,
+                                    message="Not Modified without a cached page", headers=response.headers)
+                            self.cache.mark_revalidated(entry)
+                            return self.cache.read(entry)
+                        if response.status not in RETRY_STATUSES or attempt == self.retries:
+                            response.raise_for_status()
+                            html = await response.text()
+                            if self.cache is not None:
+                                self.cache.put(url, html, team, category, etag=response.headers.get("ETag"),
+                                               last_modified=response.headers.get("Last-Modified"))
+                            return html
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            # Exponential backoff before retrying a throttled, failed or timed-out request, or the server's
+            # Retry-After when that is longer
+            await asyncio.sleep(max(self.backoff * 2 ** attempt, retry_after or 0))
+
+
+async def scrape_category(client, team, link_text, category_id, base_url, save_html_dir, incremental, fmt,
+                          summary, log, journal=None):
+    try:
+        # The unit records the fetch time, requests, page bytes and parsed rows
+        with Telemetry.current().unit(team['name'], link_text) as unit:
+            html = await client.fetch(category_url(team['id'], category_id, base_url), team['name'], link_text,
+                                      metrics=unit)
+            unit.add(bytes=len(html.encode("utf-8")))
+            if save_html_dir:
+                save_page(html, save_html_dir, team['id'], category_id)
+
+            # Parsing is CPU-bound, so keep it off the event loop
+            df = await asyncio.to_thread(parse_table_4, html, team['name'], link_text)
+            table = None
+            if df is None:
+                unit.set(status="empty")
+                summary["empty"] += 1
+            else:
+                unit.add(rows=len(df))
+                table = await asyncio.to_thread(write_table, df, team['name'], link_text, incremental, fmt)
+                summary["tables"][link_text] = table
+                summary["saved"] += 1
+            if journal is not None:
+                journal.done(team['name'], link_text, table)
+    except Exception as e:
+        log(f"Error processing {link_text} for team {team['name']}: {error_text(e)}")
+        summary["errors"].append(link_text)
+        if journal is not None:
+            journal.failed(team['name'], link_text, error_text(e))
+
+
+async def scrape_team(client, team, link_texts, base_url, save_html_dir, manifest, incremental, fmt, log,
+                      journal=None):
+    summary = new_summary(team['name'], "async")
+    started = time.perf_counter()
+
+    # The team page must resolve before its category tasks can be scheduled
+    try:
+        with Telemetry.current().unit(team['name']) as unit:
+            html = await client.fetch(team_url(team['id'], base_url), team['name'], metrics=unit)
+            unit.add(bytes=len(html.encode("utf-8")))
+    except Exception as e:
+        log(f"Error loading team page for {team['name']}: {error_text(e)}")
+        summary["errors"].extend(link_texts)
+        summary["seconds"] = round(time.perf_counter() - started, 1)
+        if journal is not None:
+            for link_text in link_texts:
+                journal.failed(team['name'], link_text, error_text(e))
+        return summary
+
+    if save_html_dir:
+        save_page(html, save_html_dir, team['id'])
+    category_ids = resolve_category_ids(html, link_texts)
+    summary["games"] = count_games(html)
+    if journal is not None:
+        journal.team_page(team['name'], summary["games"])
+    if incremental and is_team_current(manifest, team['name'], summary["games"], link_texts):
+        log(f"No new games for team {team['name']}, skipping.")
+        summary["skipped"] = True
+        summary["seconds"] = round(time.perf_counter() - started, 1)
+        if journal is not None:
+            journal.skipped(team['name'], link_texts)
+        return summary
+
+    log(f"Resolved {len(category_ids)} category ids for team {team['name']}.")
+
+    tasks = []
+    for link_text in link_texts:
+        if link_text in category_ids:
+            tasks.append(scrape_category(client, team, link_text, category_ids[link_text],
+                                         base_url, save_html_dir, incremental, fmt, summary, log, journal))
+        else:
+            log(f"Link {link_text} not found on the team page for {team['name']}.")
+            summary["errors"].append(link_text)
+            if journal is not None:
+                journal.failed(team['name'], link_text, "link not found on the team page")
+    await asyncio.gather(*tasks)
+
+    summary["seconds"] = round(time.perf_counter() - started, 1)
+    return summary
+
+
+async def scrape_teams_async(teams, link_texts, base_url=BASE_URL, concurrency=8, rate=4.0, burst=4,
+                             timeout=30, save_html_dir=None, manifest=None, incremental=False,
+                             cache=None, replay=False, fmt="csv", log=print, journal=None):
+    """Scrape every (team, category) pair as one asyncio task graph.
+
+    Requests are capped at `concurrency` in flight and limited to `rate` per second per host. Each
+    category's outcome is checkpointed in `journal` (a ScrapeJournal) when given.
+    Returns one summary dict per team in the same shape as ScrapeNCAA.scrape_team.
+    """
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=client_timeout, connector=connector,
+                                     headers={"User-Agent": USER_AGENT}) as session:
+        client = RateLimitedClient(session, rate=rate, burst=burst, concurrency=concurrency,
+                                   cache=cache, replay=replay)
+        summaries = await asyncio.gather(*[
+            scrape_team(client, team, link_texts, base_url, save_html_dir, manifest, incremental, fmt, log, journal)
+            for team in teams
+        ])
+    log(f"Sent {client.request_count} requests.")
+    return list(summaries)
@@ -0,0 +1,78 @@
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import pandas as pd
+from CombineAllTeamsData import add_derived_metrics, combine_all_teams, load_team_combined_frames, sort_by_date
+from CombineEngine import combine_directory
+from CombineIndividualTeamFiles import combine_team_tables, load_team_tables, save_team_combined
+from ScrapeCommon import OUTPUT_DIRECTORY, load_active_link_texts, load_active_teams, table_filename
+
+
+def build_scaled_directory(directory, team_names, link_texts, copies):
+    # Copy every team's category CSVs `copies` times under new team names ("BYU", "BYU 2", ...)
+    scaled_names = []
+    for copy in range(1, copies + 1):
+        for team_name in team_names:
+            scaled_name = team_name if copy == 1 else f"{team_name} {copy}"
+            scaled_names.append(scaled_name)
+            for link_text in link_texts:
+                source = os.path.join(OUTPUT_DIRECTORY, table_filename(team_name, link_text))
+                if os.path.exists(source):
+                    df = pd.read_csv(source, dtype=str, keep_default_na=False)
+                    df["TeamNM"] = scaled_name
+                    df.to_csv(os.path.join(directory, table_filename(scaled_name, link_text)), index=False)
+    return scaled_names
+
+
+def run_legacy(directory, team_names, link_texts):
+    # CombineIndividualTeamFiles.py followed by CombineAllTeamsData.py, writing through the CSV files
+    for team_name in team_names:
+        combined_df = combine_team_tables(load_team_tables(team_name, link_texts, output_directory=directory))
+        if combined_df is not None:
+            save_team_combined(combined_df, team_name, output_directory=directory)
+    frames = [add_derived_metrics(sort_by_date(df))
+              for df in load_team_combined_frames(team_names, input_directory=directory)]
+    output_filepath = os.path.join(directory, "legacy.csv")
+    combine_all_teams(frames).to_csv(output_filepath, index=False)
+    return output_filepath
+
+
+def run_engine(directory, team_names, link_texts):
+    output_filepath = os.path.join(directory, "engine.csv")
+    combine_directory(directory, team_names, link_texts).to_csv(output_filepath, index=False)
+    return output_filepath
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # The legacy steps print every file they load
+        result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the merge-chain combine with CombineEngine.py.")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 9],
+                        help="Replicate the active teams this many times (1 = today's 16, 9 = 144 teams).")
+    args = parser.parse_args()
+
+    team_names = [team['name'] for team in load_active_teams()]
+    link_texts = load_active_link_texts()
+
+    for copies in args.copies:
+        with tempfile.TemporaryDirectory() as directory:
+            scaled_names = build_scaled_directory(directory, team_names, link_texts, copies)
+            legacy_seconds, legacy_filepath = timed(run_legacy, directory, scaled_names, link_texts)
+            engine_seconds, engine_filepath = timed(run_engine, directory, scaled_names, link_texts)
+            with open(legacy_filepath, "rb") as legacy, open(engine_filepath, "rb") as engine:
+                identical = legacy.read() == engine.read()
+
+        print(f"{len(scaled_names):>4} teams: merge chain {legacy_seconds:6.2f}s, engine {engine_seconds:6.2f}s, "
+              f"speedup {legacy_seconds / engine_seconds:4.1f}x, identical output: {identical}")
+
+
+if __name__ == "__main__":
+    main()
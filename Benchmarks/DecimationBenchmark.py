@@ -0,0 +1,37 @@
+import argparse
+import time
+from Benchmarks.TrendlineBenchmark import best_of, synthetic_games
+from DashboardFigures import build_figure
+
+
+def points_figure(df, graph_type, **options):
+    return build_figure(df, "Points For", "Points For", graph_type, "Game Number", "Game Number", {}, True,
+                        **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Line and scatter figures at full-FBS, multi-season scale: "
+                                                 "every point as SVG versus WebGL with LTTB decimation.")
+    parser.add_argument("--teams", type=int, default=134)
+    parser.add_argument("--games", type=int, default=130, help="Games per team (about ten seasons by default).")
+    parser.add_argument("--max-points", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_games(args.teams, args.games)
+    print(f"{args.teams} teams x {args.games} games ({len(df)} points), best of {args.repeat} runs")
+
+    for graph_type in ("Line Chart", "Scatter Plot"):
+        for label, options in (("all points, SVG", dict(webgl_threshold=len(df) + 1, max_points=len(df))),
+                               ("decimated, WebGL", dict(max_points=args.max_points))):
+            seconds, fig = best_of(args.repeat, lambda: points_figure(df, graph_type, **options))
+            started = time.perf_counter()
+            size = len(fig.to_json())
+            serialize = time.perf_counter() - started
+            points = sum(len(trace.x) for trace in fig.data if trace.showlegend is not False)
+            print(f"  {graph_type:12} {label:17} build {seconds * 1000:7.1f} ms, to_json {serialize * 1000:6.1f} ms, "
+                  f"{size / 1024:6.0f} KiB, {points} points, {fig.data[0].type}")
+
+
+if __name__ == "__main__":
+    main()
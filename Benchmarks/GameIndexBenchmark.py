@@ -0,0 +1,61 @@
+import argparse
+import os
+import time
+import pandas as pd
+from GameIndex import GameIndex
+from ScrapeCommon import OUTPUT_DIRECTORY
+
+
+def scale_frame(df, copies):
+    # Replicate every team's games `copies` times under new team names ("BYU", "BYU 2", ...)
+    frames = []
+    for copy in range(1, copies + 1):
+        scaled = df.copy()
+        if copy > 1:
+            scaled["TeamNM"] = scaled["TeamNM"] + f" {copy}"
+        frames.append(scaled)
+    return pd.concat(frames, ignore_index=True)
+
+
+def scan_filter(df, teams, start_date, end_date):
+    # What Streamlit_App.py did on every rerun
+    filtered_df = df[(df['TeamNM'].isin(teams)) & (df['Date'] >= start_date) & (df['Date'] <= end_date)]
+    return filtered_df.sort_values(['TeamNM', 'Date'])
+
+
+def mean_seconds(repeat, function, *args):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function(*args)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the dashboard's scan-and-sort filter with GameIndex.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="Multiples of today's All_Teams_Combined row count.")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--teams", nargs="+", default=["BYU", "Utah"])
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(OUTPUT_DIRECTORY, "All_Teams_Combined.csv"), parse_dates=['Date'])
+    windows = {
+        "season": (df['Date'].min(), df['Date'].max()),
+        "October": (pd.Timestamp("2023-10-01"), pd.Timestamp("2023-10-31")),
+    }
+
+    for scale in args.scales:
+        scaled_df = scale_frame(df, scale)
+        build_seconds, index = mean_seconds(1, GameIndex, scaled_df)
+        print(f"{len(scaled_df):>7} rows ({scale}x): index built in {build_seconds * 1000:.1f} ms")
+        for window, (start_date, end_date) in windows.items():
+            scan_seconds, expected = mean_seconds(args.repeat, scan_filter, scaled_df, args.teams, start_date, end_date)
+            query_seconds, actual = mean_seconds(args.repeat, index.query, args.teams, start_date, end_date)
+            same = actual.reset_index(drop=True).equals(expected.reset_index(drop=True))
+            print(f"  {window:<8} {len(actual):>3} games: scan + sort {scan_seconds * 1000:7.3f} ms, "
+                  f"index query {query_seconds * 1000:7.3f} ms, speedup {scan_seconds / query_seconds:5.1f}x, "
+                  f"same rows: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import filecmp
+import os
+import shutil
+import tempfile
+import time
+import pandas as pd
+from CombineAllTeamsData import combine_team_frames
+from CombineIndividualTeamFiles import combine_teams
+from IncrementalCombine import combine_all_incremental, combine_teams_incremental
+from ScrapeCommon import OUTPUT_DIRECTORY, combined_filename, load_active_link_texts, load_active_teams, table_filename
+
+
+def replicate_teams(directory, copies, link_texts, source_directory=OUTPUT_DIRECTORY):
+    # `copies` renamed copies of every active team's category tables ("BYU 2", "BYU 3", ...)
+    teams = []
+    for team in load_active_teams():
+        for copy in range(1, copies + 1):
+            team_name = team['name'] if copy == 1 else f"{team['name']} {copy}"
+            for link_text in link_texts:
+                source = os.path.join(source_directory, table_filename(team['name'], link_text))
+                if os.path.exists(source):
+                    df = pd.read_csv(source)
+                    df["TeamNM"] = team_name
+                    df.to_csv(os.path.join(directory, table_filename(team_name, link_text)), index=False)
+            teams.append({"name": team_name})
+    return teams
+
+
+def add_one_game(directory, team_name, link_texts):
+    # A weekly update: every category table of one team gains a game a week after its last one
+    for link_text in link_texts:
+        path = os.path.join(directory, table_filename(team_name, link_text))
+        if os.path.exists(path):
+            df = pd.read_csv(path)
+            game = df.iloc[[-1]].copy()
+            game["Date"] = (pd.to_datetime(game["Date"]) + pd.Timedelta(days=7)).dt.strftime("%m/%d/%Y")
+            pd.concat([df, game]).to_csv(path, index=False)
+
+
+def full_rebuild(directory, teams, link_texts):
+    frames = combine_teams(teams, link_texts, output_directory=directory)
+    combined_df = combine_team_frames([frames[name] for name in sorted(frames, key=lambda name: combined_filename(name).lower())])
+    combined_df.to_csv(os.path.join(directory, "All_Teams_Combined.csv"), index=False)
+
+
+def incremental_rebuild(directory, teams, link_texts, manifest):
+    rebuilt = combine_teams_incremental(teams, link_texts, manifest, directory=directory)
+    return combine_all_incremental([team["name"] for team in teams], manifest, frames=rebuilt, directory=directory,
+                                   derived_directory=os.path.join(directory, "derived"))
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full recombine versus the incremental recombine after one "
+                                                 "team adds a game.")
+    parser.add_argument("--copies", type=int, default=8, help="Copies of each team (8 x 16 teams = 128).")
+    args = parser.parse_args()
+
+    link_texts = load_active_link_texts()
+    with tempfile.TemporaryDirectory() as directory:
+        teams = replicate_teams(directory, args.copies, link_texts)
+        manifest = {"teams": {}}
+        first_seconds, _ = timed(incremental_rebuild, directory, teams, link_texts, manifest)
+
+        add_one_game(directory, teams[len(teams) // 2]["name"], link_texts)
+        incremental_seconds, (_, recomputed) = timed(incremental_rebuild, directory, teams, link_texts, manifest)
+        output_path = os.path.join(directory, "All_Teams_Combined.csv")
+        shutil.copy(output_path, f"{output_path}.incremental")
+
+        full_seconds, _ = timed(full_rebuild, directory, teams, link_texts)
+        identical = filecmp.cmp(output_path, f"{output_path}.incremental", shallow=False)
+
+    print(f"\n{len(teams)} teams x {len(link_texts)} categories")
+    print(f"  first incremental run (cold)   {first_seconds:7.2f}s")
+    print(f"  full rebuild                   {full_seconds:7.2f}s")
+    print(f"  incremental, one game added    {incremental_seconds:7.2f}s ({len(recomputed)} team recomputed)")
+    print(f"  speedup {full_seconds / incremental_seconds:.0f}x, byte-identical output: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from ResultParsing import parse_results, parse_top_seconds
+from ScrapeCommon import OUTPUT_DIRECTORY
+
+
+def load_samples(rows):
+    # Resample the Result and TOP strings of All_Teams_Combined.csv up to `rows` rows
+    df = pd.read_csv(os.path.join(OUTPUT_DIRECTORY, "All_Teams_Combined.csv"),
+                     usecols=["Result", "Total Offense_TOP"], dtype=str)
+    picks = np.random.default_rng(0).integers(0, len(df), rows)
+    return df["Result"].iloc[picks].reset_index(drop=True), df["Total Offense_TOP"].iloc[picks].reset_index(drop=True)
+
+
+def run_lambdas(results, top):
+    # The per-row parsing CombineAllTeamsData.py and Streamlit_App.py used to do
+    win = results.apply(lambda x: 1 if "W" in x else 0)
+    top_converted = top.apply(
+        lambda x: round(int(x.split(":")[0]) + int(x.split(":")[1]) / 60, 2) if isinstance(x, str) else 0
+    )
+    return win, top_converted
+
+
+def run_vectorized(results, top):
+    parsed = parse_results(results)
+    return parsed, parse_top_seconds(top)
+
+
+def best_of(repeat, function, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row lambdas with ResultParsing.py.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results, top = load_samples(args.rows)
+    print(f"{args.rows} rows, best of {args.repeat} runs")
+
+    lambda_seconds, (win, top_converted) = best_of(args.repeat, run_lambdas, results, top)
+    print(f"  apply lambdas (win, TOP minutes)             {lambda_seconds * 1000:8.1f} ms")
+
+    vector_seconds, (parsed, top_seconds) = best_of(args.repeat, run_vectorized, results, top)
+    print(f"  vectorized (win, points, OT, TOP seconds)    {vector_seconds * 1000:8.1f} ms")
+
+    same_win = (parsed["Win"] == win).all()
+    same_top = np.allclose((top_seconds / 60).fillna(0).to_numpy(dtype=float).round(2), top_converted)
+    print(f"  speedup {lambda_seconds / vector_seconds:.1f}x, same win flags: {same_win}, same TOP: {same_top}")
+
+
+if __name__ == "__main__":
+    main()
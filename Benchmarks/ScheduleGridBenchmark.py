@@ -0,0 +1,86 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from ScheduleGrid import build_schedule_grid, schedule_html
+
+
+def legacy_grid(schedule_df, colors_df, selected_teams):
+    # The nested week x team loop the "Team Schedules" page used before ScheduleGrid.py
+    max_week = schedule_df['Week'].max()
+    all_weeks = list(range(1, max_week + 1))
+    filtered_schedule = schedule_df[(schedule_df['HomeTeam'].isin(selected_teams)) |
+                                    (schedule_df['AwayTeam'].isin(selected_teams))]
+    grid_data = []
+    for week in all_weeks:
+        week_data = {"Week": week}
+        for team in selected_teams:
+            team_color = colors_df[colors_df['Team'] == team]['Color'].values[0]
+            team_schedule = filtered_schedule[(filtered_schedule['Week'] == week) &
+                                              ((filtered_schedule['HomeTeam'] == team) |
+                                               (filtered_schedule['AwayTeam'] == team))]
+            if not team_schedule.empty:
+                game = team_schedule.iloc[0]
+                opp = f"@{game['HomeTeam']}" if game['AwayTeam'] == team else game['AwayTeam']
+                formatted_date = f"{game['Start Date'].strftime('%m/%d/%Y').lstrip('0').replace('/0', '/')} ({game['Day']})"
+                if game['HomeTeam'] == team:
+                    week_data[
+                        team] = f"<div style='background-color:{team_color};color:white;padding:5px;border-radius:5px;'>{formatted_date} {opp}</div>"
+                else:
+                    week_data[team] = f"{formatted_date} {opp}"
+            else:
+                week_data[team] = "bye"
+        grid_data.append(week_data)
+    return pd.DataFrame(grid_data)
+
+
+def synthetic_schedule(teams, weeks, seed=0):
+    # Random pairings each week; about one team in eight has a bye and a few play twice in a week
+    rng = np.random.default_rng(seed)
+    rows = []
+    for week in range(1, weeks + 1):
+        order = list(rng.permutation(teams))[:len(teams) - len(teams) // 8]
+        order += list(rng.choice(order, 4, replace=False))
+        kickoff = pd.Timestamp("2024-08-31") + pd.Timedelta(weeks=week - 1)
+        for home, away in zip(order[0::2], order[1::2]):
+            if home != away:
+                day = kickoff - pd.Timedelta(days=int(rng.integers(0, 3)))
+                rows.append({"Week": week, "HomeTeam": home, "AwayTeam": away, "Start Date": day})
+    schedule_df = pd.DataFrame(rows)
+    schedule_df['Day'] = schedule_df['Start Date'].dt.strftime('%a')
+    colors_df = pd.DataFrame({"Team": teams, "Color": [f"#{rng.integers(0, 2 ** 24):06X}" for _ in teams]})
+    return schedule_df, colors_df
+
+
+def best_of(repeat, function, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the nested-loop schedule grid with ScheduleGrid.py.")
+    parser.add_argument("--teams", type=int, default=130)
+    parser.add_argument("--weeks", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    teams = [f"Team {number:03d}" for number in range(1, args.teams + 1)]
+    schedule_df, colors_df = synthetic_schedule(teams, args.weeks)
+    print(f"{len(teams)} teams x {args.weeks} weeks ({len(schedule_df)} games), best of {args.repeat} runs")
+
+    legacy_seconds, legacy_df = best_of(args.repeat, legacy_grid, schedule_df, colors_df, teams)
+    print(f"  nested loop   {legacy_seconds * 1000:9.1f} ms")
+    vector_seconds, grid_df = best_of(args.repeat, build_schedule_grid, schedule_df, colors_df, teams)
+    print(f"  ScheduleGrid  {vector_seconds * 1000:9.1f} ms")
+
+    identical = schedule_html(grid_df) == schedule_html(legacy_df)
+    print(f"  speedup {legacy_seconds / vector_seconds:.0f}x, byte-identical HTML: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from Benchmarks.SyntheticData import generate, pages, required_link_texts, write_csvs
+from ColumnStore import open_column_store
+from CombineAllTeamsData import combine_team_frames
+from CombineIndividualTeamFiles import combine_teams
+from CompactFrame import STAT_LIST_PATH, widen
+from DashboardFigures import build_figure
+from GameIndex import GameIndex
+from ScrapeCommon import combined_filename, parse_table_4
+
+RESULTS_PATH = "benchmark_results.json"
+BENCHMARKS = ["parse", "merge", "metrics", "dashboard"]
+
+# A benchmark more than this fraction slower than the baseline is reported as a regression
+DEFAULT_TOLERANCE = 0.2
+
+# Teams and stats on each benchmarked dashboard view
+VIEW_TEAMS = 4
+VIEW_STATS = 3
+
+
+def best_of(repeat, function):
+    # Fastest of `repeat` runs (the least disturbed by other load) and the last result
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def quietly(function, *args, **kwargs):
+    # The pipeline functions print a line per file; keep the suite's output to the results
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+def bench_parse(context, repeat):
+    # Table 4 of every generated page to a DataFrame, as each scraper backend does
+    html_pages = pages(context["tables"])
+
+    def parse_all():
+        return [parse_table_4(html, team_name, link_text) for (team_name, link_text), html in html_pages.items()]
+
+    seconds, _ = best_of(repeat, parse_all)
+    return seconds, len(html_pages), "pages"
+
+
+def bench_merge(context, repeat):
+    # CombineIndividualTeamFiles: every team's category tables merged into its _Combined.csv
+    directory = context["directory"]
+    teams = [{"name": team_name} for team_name in context["team_names"]]
+    seconds, frames = best_of(repeat, lambda: quietly(combine_teams, teams, context["link_texts"],
+                                                      output_directory=directory))
+    context["frames"] = frames
+    return seconds, len(teams), "teams"
+
+
+def bench_metrics(context, repeat):
+    # CombineAllTeamsData: derived metrics for every team, stacked in the order the script reads the files
+    if "frames" not in context:
+        context["frames"] = quietly(combine_teams, [{"name": team_name} for team_name in context["team_names"]],
+                                    context["link_texts"], output_directory=context["directory"])
+    frames = [context["frames"][team_name]
+              for team_name in sorted(context["frames"], key=lambda name: combined_filename(name).lower())]
+    seconds, combined_df = best_of(repeat, lambda: combine_team_frames(frames))
+    context["combined"] = combined_df
+    return seconds, len(combined_df), "rows"
+
+
+def bench_dashboard(context, repeat):
+    # Streamlit_App.py's work per view: index query of a few teams over the whole date range, widen, and a line
+    # and scatter figure per stat; the store is built (untimed) from the metrics output
+    if "combined" not in context:
+        bench_metrics(context, 1)
+    path = os.path.join(context["directory"], "All_Teams_Combined.csv")
+    context["combined"].to_csv(path, index=False)
+    with open(path, "rb") as f:
+        fingerprint = hashlib.sha256(f.read()).hexdigest()
+
+    # StatList.csv rows of the generated categories only (fewer than all of them may be generated)
+    statlist_df = pd.read_csv(STAT_LIST_PATH)
+    statlist_df = statlist_df[statlist_df['Column'].isin(context["combined"].columns)]
+    stat_list_path = os.path.join(context["directory"], "StatList.csv")
+    statlist_df.to_csv(stat_list_path, index=False)
+
+    column_store = quietly(open_column_store, path, fingerprint, stat_list_path=stat_list_path,
+                           store_directory=os.path.join(context["directory"], "columns"))
+    games = GameIndex(column_store.dimensions(), column_store=column_store)
+
+    active_stats = statlist_df[(statlist_df['Active'] == 1) & (statlist_df['Category'] != 'Dimension')]
+    columns = [column for column in active_stats['Column'] if column in column_store.stat_columns][:VIEW_STATS]
+    teams = games.teams
+    views = [teams[start:start + VIEW_TEAMS] for start in range(0, len(teams), VIEW_TEAMS)]
+
+    def draw_views():
+        figures = 0
+        for view_teams in views:
+            filtered_df = widen(games.query(view_teams, games.min_date, games.max_date, columns=columns))
+            for column in columns:
+                for graph_type in ("Line Chart", "Scatter Plot"):
+                    build_figure(filtered_df, column, column, graph_type, 'Game Number',
+                                 'Game Number (Multiple Teams)', {}, len(view_teams) > 1)
+                    figures += 1
+        return figures
+
+    seconds, figures = best_of(repeat, draw_views)
+    return seconds, figures, "figures"
+
+
+BENCHMARK_FUNCTIONS = {"parse": bench_parse, "merge": bench_merge, "metrics": bench_metrics,
+                       "dashboard": bench_dashboard}
+
+
+def run_suite(teams, seasons, categories, only=None, repeat=3, seed=0):
+    """Generate the synthetic data and run the benchmarks; returns the results document."""
+    started = time.perf_counter()
+    tables = generate(teams, seasons, categories, seed)
+    generate_seconds = time.perf_counter() - started
+
+    directory = tempfile.mkdtemp(prefix="football_bench_")
+    try:
+        write_csvs(tables, directory)
+        context = {"tables": tables, "directory": directory,
+                   "team_names": list(dict.fromkeys(team_name for team_name, _ in tables)),
+                   "link_texts": list(dict.fromkeys(link_text for _, link_text in tables))}
+        results = {}
+        for name in only or BENCHMARKS:
+            seconds, items, unit = BENCHMARK_FUNCTIONS[name](context, repeat)
+            results[name] = {"seconds": seconds, "items": items, "unit": unit,
+                             "per_second": items / seconds if seconds else None}
+            print(f"{name:<10} {seconds:>9.3f}s  {items:>8} {unit:<8} {items / seconds if seconds else 0:>12.1f}/s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "environment": {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+                        "platform": platform.platform(), "cpus": os.cpu_count()},
+        "scale": {"teams": teams, "seasons": seasons, "categories": categories, "seed": seed,
+                  "tables": len(tables), "games": sum(len(df) for df in tables.values()) // max(categories, 1)},
+        "repeat": repeat,
+        "generate_seconds": generate_seconds,
+        "benchmarks": results,
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Print each benchmark's time against the baseline's; returns the names that slowed down by more than
+    `tolerance` (a fraction)."""
+    if results["scale"] != baseline["scale"]:
+        print(f"Warning: baseline scale {baseline['scale']} differs from this run's {results['scale']}")
+    regressions = []
+    print(f"\n{'benchmark':<10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, current in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            print(f"{name:<10} {'-':>10} {current['seconds']:>9.3f}s  (not in baseline)")
+            continue
+        before = baseline["benchmarks"][name]["seconds"]
+        change = current["seconds"] / before - 1 if before else 0.0
+        flag = "REGRESSION" if change > tolerance else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<10} {before:>9.3f}s {current['seconds']:>9.3f}s {change:>+7.0%}  {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing, merging, metrics and dashboard preparation on "
+                                                 "synthetic teams x seasons x categories data.")
+    parser.add_argument("--teams", type=int, default=130)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--categories", type=int, default=17)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is reported.")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Run only these benchmarks.")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Where to write the results JSON.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Results JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown against the baseline as a fraction (default 0.2 = 20%%).")
+    args = parser.parse_args()
+    if args.categories < len(required_link_texts()):
+        parser.error(f"--categories must be at least {len(required_link_texts())} "
+                     f"({', '.join(required_link_texts())}, which the derived metrics read)")
+
+    results = run_suite(args.teams, args.seasons, args.categories, args.only, args.repeat, args.seed)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import glob
+import html as html_text
+import os
+import numpy as np
+import pandas as pd
+from HttpScrape import saved_page_filename
+from MetricsEngine import input_columns, load_metric_definitions
+from ScrapeCommon import DIMENSION_COLUMNS, OUTPUT_DIRECTORY, load_active_link_texts, table_filename
+
+GAMES_PER_SEASON = 12
+LAST_SEASON = 2023
+
+# Chance that a category table is missing a game the team played (the merge then fills the gap)
+MISSING_GAME_RATE = 0.02
+
+
+def required_link_texts(link_texts=None):
+    # The categories whose columns MetricDefinitions.csv reads; the derived metrics cannot be computed without them
+    link_texts = link_texts or load_active_link_texts()
+    numeric, text = input_columns(load_metric_definitions())
+    return [link_text for link_text in link_texts
+            if any(column.startswith(f"{link_text}_") for column in numeric + text)]
+
+
+def category_names(categories, link_texts=None):
+    """The categories the metric definitions need plus the next active link texts, up to `categories`, in link
+    order; past the real ones, copies named "Rushing 2", "Passing 2", ..."""
+    link_texts = link_texts or load_active_link_texts()
+    required = required_link_texts(link_texts)
+    if categories < len(required):
+        raise ValueError(f"At least {len(required)} categories are needed for the metric definitions "
+                         f"({', '.join(required)})")
+    fillers = [link_text for link_text in link_texts if link_text not in required][:categories - len(required)]
+    names = [link_text for link_text in link_texts if link_text in required or link_text in fillers]
+    for number in range(len(link_texts), categories):
+        copy, position = divmod(number, len(link_texts))
+        names.append(f"{link_texts[position]} {copy + 1}")
+    return names
+
+
+def value_pools(link_texts, source_directory=OUTPUT_DIRECTORY):
+    """{link text: {stat header: array of the values (as text) seen in every team's real table}}."""
+    pools = {}
+    for link_text in link_texts:
+        frames = [pd.read_csv(path, dtype=str, keep_default_na=False)
+                  for path in sorted(glob.glob(os.path.join(source_directory, table_filename("*", link_text))))]
+        if not frames:
+            raise FileNotFoundError(f"No {link_text} tables in {source_directory} to model the values on")
+        df = pd.concat(frames, ignore_index=True)
+        pools[link_text] = {column[len(link_text) + 1:]: df[column].to_numpy()
+                            for column in df.columns if column not in DIMENSION_COLUMNS}
+    return pools
+
+
+def team_names(teams):
+    return [f"Team {number:03d}" for number in range(1, teams + 1)]
+
+
+def synthetic_schedule(teams, seasons, seed=0):
+    """One row per team and game (TeamNM, Date, Opponent, Result), GAMES_PER_SEASON games a season played
+    on Saturdays from September of each season through LAST_SEASON."""
+    rng = np.random.default_rng(seed)
+    names = np.array(team_names(teams))
+    frames = []
+    for season in range(LAST_SEASON - seasons + 1, LAST_SEASON + 1):
+        first_saturday = pd.Timestamp(f"{season}-09-01") + pd.offsets.Week(weekday=5)
+        dates = pd.date_range(first_saturday, periods=GAMES_PER_SEASON, freq="7D")
+        count = teams * GAMES_PER_SEASON
+        opponents = names[(np.repeat(np.arange(teams), GAMES_PER_SEASON) + rng.integers(1, max(teams, 2), count))
+                          % teams]
+        away = rng.random(count) < 0.5
+        points_for = rng.integers(0, 56, count)
+        points_against = rng.integers(0, 56, count)
+        points_against = np.where(points_against == points_for, points_against + 3, points_against)
+        overtime = np.where(rng.random(count) < 0.03, " (2 OT)", "")
+        frames.append(pd.DataFrame({
+            "TeamNM": np.repeat(names, GAMES_PER_SEASON),
+            "Date": np.tile(dates.strftime("%m/%d/%Y"), teams),
+            "Opponent": np.where(away, "@ ", "") + opponents,
+            "Result": np.where(points_for > points_against, "W ", "L ") + points_for.astype(str) + "-" +
+            points_against.astype(str) + overtime,
+        }))
+    # Seasons were added in order, so a stable sort by team keeps each team's games by date
+    return pd.concat(frames, ignore_index=True).sort_values("TeamNM", kind="stable").reset_index(drop=True)
+
+
+def category_table(schedule, link_text, pool, rng):
+    """A category table as parse_table_4 returns it (all text, stat columns prefixed with the link text),
+    with each stat drawn from the real values of that column."""
+    keep = rng.random(len(schedule)) >= MISSING_GAME_RATE
+    df = schedule[keep].reset_index(drop=True)
+    stats = {f"{link_text}_{header}": rng.choice(values, len(df)) for header, values in pool.items()}
+    return pd.concat([df, pd.DataFrame(stats)], axis=1)
+
+
+def table_4_page(team_df, link_text, team_id=None, category_ids=None):
+    """An HTML page shaped like a stats.ncaa.org category page: navigation links, three leading tables and
+    the game-by-game Table 4 with its Totals rows."""
+    headers = ["Date", "Opponent", "Result"] + [column[len(link_text) + 1:] for column in team_df.columns[4:]]
+    rows = team_df.drop(columns=["TeamNM"]).to_numpy()
+    parts = ["<html><head><title>Team Statistics</title></head><body><div id='contentarea'>"]
+    for name, category_id in (category_ids or {}).items():
+        parts.append(f'<a href="/players/{team_id}?year_stat_category_id={category_id}">{html_text.escape(name)}</a> ')
+    for number in range(3):
+        parts.append(f'<table class="mytable" width="50%"><tr class="heading"><td>Table {number + 1}</td></tr>'
+                     f'<tr><td>&nbsp;</td></tr></table>')
+    parts.append('<table class="mytable" width="100%" id="game_breakdown_div"><thead><tr class="grey_heading">')
+    parts.extend(f"<th>{html_text.escape(header)}</th>" for header in headers)
+    parts.append("</tr></thead><tbody>")
+    for row in rows:
+        cells = [f"<td>{row[0]}</td>", f'<td><a href="/teams/0">{html_text.escape(row[1])}</a></td>',
+                 f'<td><a href="/contests/0/box_score">{row[2]}</a></td>']
+        cells.extend(f'<td align="right">{value}</td>' for value in row[3:])
+        parts.append("<tr>" + "".join(cells) + "</tr>")
+    for label in ("Totals", "Defensive Totals"):
+        parts.append(f"<tr><td>{label}</td>" + "<td></td>" * (len(headers) - 1) + "</tr>")
+    parts.append("</tbody></table></div></body></html>")
+    return "".join(parts)
+
+
+def generate(teams, seasons, categories, seed=0, source_directory=OUTPUT_DIRECTORY):
+    """Synthetic category tables: {(team, link text): DataFrame} for teams x seasons x categories."""
+    rng = np.random.default_rng(seed)
+    link_texts = load_active_link_texts()
+    pools = value_pools(link_texts, source_directory)
+    schedule = synthetic_schedule(teams, seasons, seed)
+    tables = {}
+    for link_text in category_names(categories, link_texts):
+        # Copies of a category ("Rushing 2") draw from the real category's values
+        pool = pools[link_text] if link_text in pools else pools[link_text.rsplit(" ", 1)[0]]
+        df = category_table(schedule, link_text, pool, rng)
+        for team_name, team_df in df.groupby("TeamNM", sort=False):
+            tables[(team_name, link_text)] = team_df.reset_index(drop=True)
+    return tables
+
+
+def pages(tables):
+    """{(team, link text): Table 4 page HTML} for generated tables."""
+    return {key: table_4_page(df, key[1]) for key, df in tables.items()}
+
+
+def write_csvs(tables, directory):
+    os.makedirs(directory, exist_ok=True)
+    for (team_name, link_text), df in tables.items():
+        df.to_csv(os.path.join(directory, table_filename(team_name, link_text)), index=False)
+
+
+def write_fixture_pages(tables, directory, first_team_id=9000001, first_category_id=20000):
+    """Write team and category pages under the names FixtureServer.py serves, plus a teams.csv and a
+    link_texts.csv for the generated teams and categories, so the scrapers can run from `directory` against
+    a FixtureServer.py serving it."""
+    os.makedirs(directory, exist_ok=True)
+    names = list(dict.fromkeys(team_name for team_name, _ in tables))
+    link_texts = list(dict.fromkeys(link_text for _, link_text in tables))
+    team_ids = {team_name: first_team_id + number for number, team_name in enumerate(names)}
+    category_ids = {link_text: first_category_id + number for number, link_text in enumerate(link_texts)}
+    for (team_name, link_text), df in tables.items():
+        team_id = team_ids[team_name]
+        page = table_4_page(df, link_text, team_id, category_ids)
+        with open(os.path.join(directory, saved_page_filename(team_id, category_ids[link_text])), "w",
+                  encoding="utf-8") as f:
+            f.write(page)
+        if link_text == link_texts[0]:
+            # The team page shows the first category's games, which the scrapers count
+            with open(os.path.join(directory, saved_page_filename(team_id)), "w", encoding="utf-8") as f:
+                f.write(page)
+    pd.DataFrame({"name": names, "id": [team_ids[name] for name in names], "active": 1}).to_csv(
+        os.path.join(directory, "teams.csv"), index=False)
+    pd.DataFrame({"link_text": link_texts, "active": 1}).to_csv(os.path.join(directory, "link_texts.csv"),
+                                                                 index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic category tables and Table 4 pages modeled "
+                                                 "on the scraped TeamDataFiles/ tables.")
+    parser.add_argument("directory", help="Output directory.")
+    parser.add_argument("--teams", type=int, default=130)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--categories", type=int, default=17)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pages", action="store_true",
+                        help="Also write FixtureServer.py pages (with teams.csv and link_texts.csv).")
+    args = parser.parse_args()
+    if args.categories < len(required_link_texts()):
+        parser.error(f"--categories must be at least {len(required_link_texts())} "
+                     f"({', '.join(required_link_texts())}, which the derived metrics read)")
+
+    generated = generate(args.teams, args.seasons, args.categories, args.seed)
+    write_csvs(generated, args.directory)
+    if args.pages:
+        write_fixture_pages(generated, os.path.join(args.directory, "pages"))
+    print(f"Wrote {len(generated)} category tables for {args.teams} teams x {args.seasons} season(s) x "
+          f"{args.categories} categories to {args.directory}")
@@ -0,0 +1,58 @@
+import argparse
+import glob
+import os
+import time
+from TableExtract import available_backends, extract_table
+
+
+def load_pages(directory):
+    pages = {}
+    for filepath in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(filepath, encoding="utf-8") as f:
+            pages[os.path.basename(filepath)] = f.read()
+    return pages
+
+
+def time_backend(pages, backend, repeat):
+    # Best-of-`repeat` wall time for extracting Table 4 from every page
+    best = float("inf")
+    results = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = {name: extract_table(html, index=3, backend=backend) for name, html in pages.items()}
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Table 4 extraction backends over saved HTML pages.")
+    parser.add_argument("directory", nargs="?", default="SavedPages",
+                        help="Directory of pages saved with ScrapeNCAA.py --save-html.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_pages(args.directory)
+    if not pages:
+        print(f"No .html pages found in {args.directory}.")
+        return
+
+    total_bytes = sum(len(html) for html in pages.values())
+    print(f"{len(pages)} pages, {total_bytes / 1024:.0f} KiB, best of {args.repeat} runs")
+
+    timings = {}
+    outputs = {}
+    for backend in available_backends():
+        timings[backend], outputs[backend] = time_backend(pages, backend, args.repeat)
+        print(f"  {backend:<5} {timings[backend] * 1000:9.1f} ms total  "
+              f"{timings[backend] * 1000 / len(pages):7.2f} ms/page")
+
+    if "lxml" in timings:
+        mismatched = [name for name in pages if outputs["lxml"][name] != outputs["bs4"][name]]
+        print(f"  speedup {timings['bs4'] / timings['lxml']:.1f}x, "
+              f"{len(mismatched)} page(s) with differing output {mismatched[:5] if mismatched else ''}")
+    else:
+        print("  lxml is not installed; only the BeautifulSoup backend was timed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import json
+import time
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from DashboardFigures import add_trendlines
+
+
+def synthetic_games(teams, games, seed=0):
+    # One row per team and game with a noisy upward trend, shaped like the dashboard's filtered frame
+    rng = np.random.default_rng(seed)
+    team_names = np.repeat([f"Team {number:03d}" for number in range(1, teams + 1)], games)
+    game_number = np.tile(np.arange(1, games + 1), teams)
+    value = np.round(20 + 0.5 * game_number + rng.normal(0, 5, teams * games), 2)
+    return pd.DataFrame({"TeamNM": team_names, "Game Number": game_number, "Points For": value})
+
+
+def best_of(repeat, function, *args):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def markers_figure(df):
+    return px.scatter(df, x="Game Number", y="Points For", color="TeamNM")
+
+
+def statsmodels_figure(df):
+    return px.scatter(df, x="Game Number", y="Points For", color="TeamNM", trendline="ols")
+
+
+def batched_figure(df):
+    fig = px.scatter(df, x="Game Number", y="Points For", color="TeamNM")
+    return add_trendlines(fig, df, "Game Number", "Points For")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare px trendline='ols' with DashboardFigures.add_trendlines.")
+    parser.add_argument("--teams", type=int, default=60)
+    parser.add_argument("--games", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_games(args.teams, args.games)
+    print(f"{args.teams} teams x {args.games} games ({len(df)} points), best of {args.repeat} runs")
+
+    markers_seconds, _ = best_of(args.repeat, markers_figure, df)
+    print(f"  markers only           {markers_seconds * 1000:9.1f} ms")
+    statsmodels_seconds, old_fig = best_of(args.repeat, statsmodels_figure, df)
+    print(f"  statsmodels per trace  {statsmodels_seconds * 1000:9.1f} ms")
+    batched_seconds, new_fig = best_of(args.repeat, batched_figure, df)
+    print(f"  batched NumPy          {batched_seconds * 1000:9.1f} ms")
+
+    old_data = json.loads(old_fig.to_json())["data"]
+    new_data = json.loads(new_fig.to_json())["data"]
+    same = len(old_data) == len(new_data) and all(
+        {k: v for k, v in old.items() if k != "y"} == {k: v for k, v in new.items() if k != "y"} and
+        np.allclose(old["y"]["bdata"] if isinstance(old["y"], dict) else old["y"],
+                    new["y"]["bdata"] if isinstance(new["y"], dict) else new["y"])
+        for old, new in zip(old_data, new_data))
+    print(f"  trendline cost {(statsmodels_seconds - markers_seconds) * 1000:.1f} ms -> "
+          f"{(batched_seconds - markers_seconds) * 1000:.1f} ms, same traces and hover text: {same}")
+
+
+if __name__ == "__main__":
+    main()
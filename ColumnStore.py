@@ -0,0 +1,172 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from CompactFrame import DASHBOARD_COLUMNS, STAT_LIST_PATH, compact_frame, stat_list_columns
+from TableStore import STORE_DIRECTORY, all_teams_combined_path, read_combined_file
+
+COLUMN_STORE_DIRECTORY = os.path.join(STORE_DIRECTORY, "columns")
+
+# Stores for other versions are removed once they are neither among the KEEP_VERSIONS most recently opened
+# nor opened within STALE_SECONDS, since another dashboard process may still be reading them
+KEEP_VERSIONS = 3
+STALE_SECONDS = 24 * 3600
+
+
+class ColumnStore:
+    """The dashboard frame split into eagerly loaded dimensions and lazily mapped stat columns.
+
+    A store directory holds dimensions.pkl (the StatList.csv Dimension columns and the dashboard's label
+    columns, sorted by team and date), one .npy file per numeric stat column in the same row order, and
+    manifest.json (column -> file, original dtype, decimal places). Stat columns are memory-mapped on
+    first request; at most `max_columns` stay mapped and the least recently used one is dropped.
+    """
+
+    def __init__(self, directory, max_columns=64):
+        self.directory = directory
+        self.max_columns = max_columns
+        self.lock = threading.Lock()
+        self.loaded = OrderedDict()
+        self.loads = 0
+        with open(os.path.join(directory, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+
+    @property
+    def stat_columns(self):
+        return list(self.manifest["columns"])
+
+    def dimensions(self):
+        return pd.read_pickle(os.path.join(self.directory, "dimensions.pkl"))
+
+    def column(self, name):
+        # Compact values of one stat column (memory-mapped), mapping it on first use
+        with self.lock:
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+                return self.loaded[name]
+
+            entry = self.manifest["columns"][name]
+            values = np.load(os.path.join(self.directory, entry["file"]), mmap_mode="r")
+            self.loaded[name] = values
+            self.loads += 1
+            while len(self.loaded) > self.max_columns:
+                self.loaded.popitem(last=False)
+            return values
+
+    def take(self, names, positions, index=None):
+        """Rows `positions` of the stat columns `names`, in their original dtypes and exact values."""
+        columns = {}
+        for name in names:
+            entry = self.manifest["columns"][name]
+            values = pd.Series(self.column(name)[positions], index=index).astype(entry["dtype"])
+            columns[name] = values.round(entry["decimals"]) if entry["decimals"] is not None else values
+        return pd.DataFrame(columns, index=index)
+
+
+def store_directory_for(fingerprint, store_directory=COLUMN_STORE_DIRECTORY):
+    return os.path.join(store_directory, fingerprint[:16])
+
+
+def build_column_store(df, directory, eager_columns):
+    """Write `df` (already in team/date order) as a store: `eager_columns` and any text columns go into
+    dimensions.pkl, every other column into its own .npy file."""
+    compact_df = compact_frame(df)
+    original_dtypes = compact_df.attrs["original_dtypes"]
+    decimals = compact_df.attrs["decimals"]
+
+    # Each builder writes its own temporary directory, so concurrent builds never touch each other's files
+    os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+    temp_directory = tempfile.mkdtemp(prefix=f"{os.path.basename(directory)}.", suffix=".tmp",
+                                      dir=os.path.dirname(directory) or ".")
+
+    manifest = {"rows": len(compact_df), "columns": {}}
+    eager = []
+    for number, column in enumerate(compact_df.columns):
+        values = compact_df[column]
+        if column in eager_columns or not pd.api.types.is_numeric_dtype(values):
+            eager.append(column)
+            continue
+        filename = f"{number}.npy"
+        np.save(os.path.join(temp_directory, filename), values.to_numpy())
+        manifest["columns"][column] = {
+            "file": filename,
+            "dtype": original_dtypes.get(column, str(values.dtype)),
+            "decimals": decimals.get(column),
+        }
+
+    dimensions_df = compact_df[eager]
+    dimensions_df.attrs = {key: {column: value for column, value in attr.items() if column in eager}
+                           for key, attr in compact_df.attrs.items()}
+    dimensions_df.to_pickle(os.path.join(temp_directory, "dimensions.pkl"))
+    with open(os.path.join(temp_directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+    # Publish the finished directory in one step so readers never see a partial store; if another process
+    # published the same version first, its store is used and this copy dropped
+    try:
+        os.replace(temp_directory, directory)
+    except OSError:
+        shutil.rmtree(temp_directory, ignore_errors=True)
+        if not os.path.exists(os.path.join(directory, "manifest.json")):
+            raise
+
+
+def remove_old_stores(store_directory, keep_directory):
+    # Other versions' stores and abandoned temporary builds, except the most recently opened versions and
+    # anything used within STALE_SECONDS (another dashboard process may still be reading it)
+    directories = [directory for directory in glob.glob(os.path.join(store_directory, "*"))
+                   if directory != keep_directory and os.path.isdir(directory)]
+    versions = sorted((directory for directory in directories if not directory.endswith(".tmp")),
+                      key=os.path.getmtime, reverse=True)
+    keep = set(versions[:KEEP_VERSIONS - 1])
+    for directory in directories:
+        if directory not in keep and time.time() - os.path.getmtime(directory) > STALE_SECONDS:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def open_column_store(path, fingerprint, stat_list_path=STAT_LIST_PATH, store_directory=COLUMN_STORE_DIRECTORY,
+                      max_columns=64):
+    """Open the store for this version of `path` (its content fingerprint), building it on first use.
+
+    Stores for other versions are removed once they are old and unused (see KEEP_VERSIONS).
+    """
+    with open(stat_list_path, "rb") as f:
+        stat_list_hash = hashlib.sha256(f.read()).hexdigest()
+    version = hashlib.sha256(f"{fingerprint}|{stat_list_hash}".encode("utf-8")).hexdigest()
+    directory = store_directory_for(version, store_directory)
+
+    if not os.path.exists(os.path.join(directory, "manifest.json")):
+        statlist_df = pd.read_csv(stat_list_path)
+        eager_columns = statlist_df[statlist_df['Category'] == 'Dimension']['Column'].tolist() + DASHBOARD_COLUMNS
+        df = read_combined_file(path, columns=stat_list_columns(stat_list_path))
+        df = df.sort_values(['TeamNM', 'Date'], kind='stable').reset_index(drop=True)
+        build_column_store(df, directory, eager_columns)
+        print(f"Built column store {directory} from {path} with shape {df.shape}")
+        remove_old_stores(store_directory, directory)
+
+    # The directory's time records when the version was last opened, which keeps it from being removed
+    os.utime(directory)
+    return ColumnStore(directory, max_columns)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dashboard's column store and report its footprint.")
+    parser.add_argument("--path", help="All_Teams_Combined file (default: the one the dashboard loads).")
+    args = parser.parse_args()
+
+    source_path = args.path or all_teams_combined_path()
+    with open(source_path, "rb") as source:
+        source_fingerprint = hashlib.sha256(source.read()).hexdigest()
+    store = open_column_store(source_path, source_fingerprint)
+    dimensions = store.dimensions()
+    print(f"{store.directory}: {dimensions.shape[1]} eager columns, "
+          f"{dimensions.memory_usage(deep=True).sum() / 1024:.0f} KiB loaded at startup; "
+          f"{len(store.stat_columns)} stat columns mapped on demand")
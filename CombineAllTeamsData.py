@@ -1,92 +1,156 @@
+import argparse
 import os
 import pandas as pd
+from MetricsEngine import compute_metrics
+from ResultParsing import add_parsed_columns
+from ScrapeCommon import OUTPUT_DIRECTORY, load_active_teams
+import TableStore
+import Telemetry
+
+
+def load_team_combined_frames(active_teams, source="csv", input_directory=OUTPUT_DIRECTORY):
+    # List all combined team files for active teams, from the CSV directory or the columnar store
+    # (rows and bytes read are recorded per team in the run's telemetry)
+    frames = []
+    if source == "parquet":
+        for team_name in active_teams:
+            path = TableStore.combined_team_path(team_name)
+            if os.path.exists(path):
+                with Telemetry.current().unit(team_name) as unit:
+                    df = pd.read_parquet(path)
+                    unit.add(rows=len(df), bytes=os.path.getsize(path))
+                frames.append(df)
+        return frames
+
+    # Sorted case-insensitively so the output row order no longer depends on the platform's listdir order
+    team_files = [
+        f for f in sorted(os.listdir(input_directory), key=str.lower)
+        if f.endswith("_Combined.csv") and f.split('_Combined')[0].replace('_', ' ') in active_teams
+    ]
+    for team_file in team_files:
+        filepath = os.path.join(input_directory, team_file)
+
+        # Load the CSV file into a DataFrame
+        with Telemetry.current().unit(team_file.split('_Combined')[0].replace('_', ' ')) as unit:
+            df = pd.read_csv(filepath)
+            unit.add(rows=len(df), bytes=os.path.getsize(filepath))
+        frames.append(df)
+    return frames
+
+
+def strip_trailing_slash(column):
+    # Remove any trailing '/' from text values, leaving numbers in mixed (multi-team) columns untouched
+    if column.dtype != "object":
+        return column
+    stripped = column.str.rstrip('/')
+    return stripped.where(stripped.notna(), column)
+
+
+def game_dates(dates):
+    # The "mm/dd/yyyy" Date text as datetimes; sorting the text would put January bowl games first
+    return pd.to_datetime(dates, format="%m/%d/%Y")
+
+
+def sort_by_date(df):
+    # Rows in date order (stable, so rows on the same date keep their order)
+    return df.sort_values(by="Date", key=game_dates, kind="stable")
+
+
+def add_game_labels(df):
+    # Per-game fields the dashboard plots with, inserted after Result; rows must be in date order per team
+    labels = pd.DataFrame({
+        "Opponent_Label": df["Opponent"] + " (" + df["Result"].str[0] + ")",  # Add W/L to opponent label
+        "Game Number": df.groupby("TeamNM").cumcount() + 1,
+    }, index=df.index)
+    labels["Game Label"] = df["TeamNM"] + " vs " + labels["Opponent_Label"]
+
+    result_index = df.columns.get_loc("Result") + 1
+    return pd.concat([df.iloc[:, :result_index], labels, df.iloc[:, result_index:]], axis=1)
+
+
+def add_derived_metrics(df):
+    """Add the parsed game columns, game labels, Cumulative Wins and the derived per-game metrics
+    defined in MetricDefinitions.csv.
+
+    `df` may hold one team or many; rows must already be in date order within each team.
+    """
+    # Remove any trailing '/' from all columns
+    df = df.apply(strip_trailing_slash)
 
-# Step 1: Load the teams from the CSV file and filter for active teams
-teams_df = pd.read_csv('teams.csv')
-active_teams = teams_df[teams_df['active'] == 1]['name'].tolist()
-
-# Step 2: Define the directory where the team files are located
-input_directory = os.path.join(".", "TeamDataFiles")
-
-# Step 3: List all combined team files for active teams in the directory
-team_files = [
-    f for f in os.listdir(input_directory)
-    if f.endswith("_Combined.csv") and f.split('_Combined')[0].replace('_', ' ') in active_teams
-]
-
-# Initialize an empty list to hold DataFrames
-dfs = []
+    # Parse Result and time of possession once into typed columns (Win, Points For, TOP Seconds, ...),
+    # followed by the game labels and numbers the dashboard reads
+    df = add_parsed_columns(add_game_labels(df))
 
-# Step 4: Loop through each team file and load it into a DataFrame
-for team_file in team_files:
-    filepath = os.path.join(input_directory, team_file)
+    # Cumulative Wins and the per-game metrics are declared in MetricDefinitions.csv
+    return compute_metrics(df)
 
-    # Load the CSV file into a DataFrame
-    df = pd.read_csv(filepath)
-    print(f"Loaded {team_file} with shape {df.shape}")
 
-    # Remove any trailing '/' from all columns
-    df = df.apply(lambda x: x.str.rstrip('/') if x.dtype == "object" else x)
-
-    # Sort by the week of play (assumed to be in the "Date" column) before calculating cumulative wins
-    df = df.sort_values(by="Date")
-
-    # Convert relevant columns to numeric, coercing errors to NaN and filling them with 0
-    df["Rushing_Rush YdsGained"] = pd.to_numeric(df["Rushing_Rush YdsGained"], errors='coerce').fillna(0)
-    df["Rushing_Rush Attempts"] = pd.to_numeric(df["Rushing_Rush Attempts"], errors='coerce').fillna(0)
-    df["Passing_Pass Yards"] = pd.to_numeric(df["Passing_Pass Yards"], errors='coerce').fillna(0)
-    df["Passing_Pass Attempts"] = pd.to_numeric(df["Passing_Pass Attempts"], errors='coerce').fillna(0)
-    df["Redzone_RZPts"] = pd.to_numeric(df["Redzone_RZPts"], errors='coerce').fillna(0)
-    df["Redzone_RZAtt"] = pd.to_numeric(df["Redzone_RZAtt"], errors='coerce').fillna(0)
-    df["Redzone_RZ Rush TD"] = pd.to_numeric(df["Redzone_RZ Rush TD"], errors='coerce').fillna(0)
-    df["Redzone_RZ Pass TD"] = pd.to_numeric(df["Redzone_RZ Pass TD"], errors='coerce').fillna(0)
-    df["Turnover Margin_FumblesLost"] = pd.to_numeric(df["Turnover Margin_FumblesLost"], errors='coerce').fillna(0)
-    df["Turnover Margin_Interceptions"] = pd.to_numeric(df["Turnover Margin_Interceptions"], errors='coerce').fillna(0)
-    df["Turnover Margin_Fumbles Recovered"] = pd.to_numeric(df["Turnover Margin_Fumbles Recovered"], errors='coerce').fillna(0)
-    df["Turnover Margin_Int"] = pd.to_numeric(df["Turnover Margin_Int"], errors='coerce').fillna(0)
-
-    # Calculate new columns
-    df["Cumulative Wins"] = df["Result"].apply(lambda x: 1 if "W" in x else 0).cumsum()
-    df["Rushing_GainedYdsPerRush"] = (df["Rushing_Rush YdsGained"] / df["Rushing_Rush Attempts"]).round(2)
-    df["Passing_YdsPerAttempt"] = (df["Passing_Pass Yards"] / df["Passing_Pass Attempts"]).round(2)
-    df["Redzone_RZPtsPerRZAtt"] = (df["Redzone_RZPts"] / df["Redzone_RZAtt"]).round(2)
-    df["Redzone_RZScoresPerRZAtt"] = (df["Redzone_RZScores"] / df["Redzone_RZAtt"]).round(2)
-    df["Redzone_RZTDConvPct"] = ((df["Redzone_RZ Rush TD"] + df["Redzone_RZ Pass TD"]) / df["Redzone_RZAtt"]).round(4)
-    df["Turnover Margin_TurnoverMargin"] = (
-        (df["Turnover Margin_FumblesLost"] + df["Turnover Margin_Interceptions"]) * -1 +
-        (df["Turnover Margin_Fumbles Recovered"] + df["Turnover Margin_Int"])
-    ).round(2)
-    df["Total Offense_TOP_Converted"] = df["Total Offense_TOP"].apply(
-        lambda x: round(int(x.split(":")[0]) + int(x.split(":")[1]) / 60, 2) if isinstance(x, str) else 0
-    )
-
-    # Insert new columns into their respective positions
-    result_index = df.columns.get_loc("Result") + 1  # Define result_index before using it
-    df = pd.concat([
-        df.iloc[:, :result_index],  # Columns up to "Result"
-        df[["Cumulative Wins"]],  # Insert "Cumulative Wins"
-        df.iloc[:, result_index:],  # Columns after "Result"
-        df[["Rushing_GainedYdsPerRush", "Passing_YdsPerAttempt",
-            "Redzone_RZPtsPerRZAtt", "Redzone_RZScoresPerRZAtt", "Redzone_RZTDConvPct",
-            "Turnover Margin_TurnoverMargin", "Total Offense_TOP_Converted"]]
-    ], axis=1)
-
-    # Append the DataFrame to the list
-    dfs.append(df)
-
-# Step 5: Concatenate all the DataFrames vertically
-if dfs:  # Ensure there is data to concatenate
-    combined_df = pd.concat(dfs, ignore_index=True)
-
-    # Step 6: Replace empty values with 0
+def combine_all_teams(frames):
+    # Concatenate all the DataFrames vertically and replace empty values with 0
+    if not frames:
+        return None
+    combined_df = pd.concat(frames, ignore_index=True)
     combined_df.fillna(0, inplace=True)
-
-    # Step 7: Save the combined DataFrame to a new CSV file
-    output_filename = "All_Teams_Combined.csv"
-    output_filepath = os.path.join(input_directory, output_filename)
-    combined_df.to_csv(output_filepath, index=False)
+    return combined_df
+
+
+def combine_team_frames(frames):
+    """Sort each team's combined table by the week of play (assumed to be in the "Date" column), add the
+    derived metrics and stack the teams; returns None when there are no frames."""
+    return combine_all_teams([add_derived_metrics(sort_by_date(df)) for df in frames])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add derived metrics and stack every team into one table.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Read and write TeamDataFiles/ CSVs or the TableStore/ columnar store.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only recompute teams whose _Combined.csv changed since the last run (CSV only).")
+    args = parser.parse_args()
+    if args.incremental and args.format != "csv":
+        parser.error("--incremental works with --format csv")
+
+    # Step 1: Load the active teams
+    active_teams = [team['name'] for team in load_active_teams()]
+
+    with Telemetry.run("CombineAllTeamsData") as telemetry:
+        if args.incremental:
+            from IncrementalCombine import combine_all_incremental, load_combine_manifest, save_combine_manifest
+            with telemetry.stage("combine_all_incremental"):
+                manifest = load_combine_manifest()
+                combined_df, recomputed = combine_all_incremental(active_teams, manifest)
+                save_combine_manifest(manifest)
+            if combined_df is None:
+                print("All teams combined file is up to date.")
+            else:
+                print(f"All teams combined file saved with shape {combined_df.shape}; "
+                      f"recomputed {len(recomputed)} team(s): {', '.join(recomputed) or 'none'}")
+            return
+
+        # Step 2: Load each active team's combined table
+        with telemetry.stage("load"):
+            frames = load_team_combined_frames(active_teams, source=args.format)
+
+        # Step 3: Calculate the derived metrics, stack the teams and save the result
+        with telemetry.stage("derive_metrics") as stage:
+            combined_df = combine_team_frames(frames)
+            if combined_df is not None:
+                stage.add(rows=len(combined_df))
+        if combined_df is None:
+            print("No active team files found to combine.")
+            return
+
+        with telemetry.stage("write") as stage:
+            if args.format == "parquet":
+                output_filepath = TableStore.write_frame(combined_df, TableStore.all_teams_path())
+            else:
+                output_filepath = os.path.join(OUTPUT_DIRECTORY, "All_Teams_Combined.csv")
+                combined_df.to_csv(output_filepath, index=False)
+            stage.add(rows=len(combined_df), bytes=os.path.getsize(output_filepath))
 
     # Output: Confirm that the file was saved
     print(f"All teams combined file saved as {output_filepath} with shape {combined_df.shape}")
-else:
-    print("No active team files found to combine.")
+
+
+if __name__ == "__main__":
+    main()
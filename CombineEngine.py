@@ -0,0 +1,124 @@
+import argparse
+import filecmp
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from CombineAllTeamsData import add_derived_metrics, game_dates
+from ScrapeCommon import OUTPUT_DIRECTORY, combined_filename, load_active_link_texts, load_active_teams, table_filename
+
+KEY_COLUMNS = ["TeamNM", "Date"]
+
+
+def read_category_tables(team_names, link_texts, input_directory=OUTPUT_DIRECTORY, threads=None):
+    """Read every existing {Team}_{Category}_Table_4.csv; returns {(team, link_text): DataFrame}."""
+    paths = {
+        (team_name, link_text): os.path.join(input_directory, table_filename(team_name, link_text))
+        for team_name in team_names for link_text in link_texts
+    }
+    paths = {key: path for key, path in paths.items() if os.path.exists(path)}
+
+    # read_csv spends most of its time in C code, so one thread per core overlaps the file I/O and parsing
+    with ThreadPoolExecutor(max_workers=threads or min(8, os.cpu_count() or 1)) as executor:
+        frames = dict(zip(paths, executor.map(pd.read_csv, paths.values())))
+    return frames
+
+
+def combine_tables(tables, team_names, link_texts):
+    """Build the all-teams wide table from the category tables in one multi-way join.
+
+    Produces the same rows, columns, dtypes and order as running CombineIndividualTeamFiles.py
+    followed by CombineAllTeamsData.py.
+    """
+    # Teams in the order CombineAllTeamsData.py reads their _Combined.csv files
+    team_order = sorted((name for name in team_names if any((name, lt) in tables for lt in link_texts)),
+                        key=lambda name: combined_filename(name).lower())
+    if not team_order:
+        return None
+
+    # Column order: the union, in team order, of each team's outer-merge column order
+    columns = []
+    for team_name in team_order:
+        team_columns = []
+        for link_text in link_texts:
+            df = tables.get((team_name, link_text))
+            if df is not None:
+                skip = KEY_COLUMNS if team_columns else []
+                team_columns += [col for col in df.columns if col not in skip and col not in team_columns]
+        columns += [col for col in team_columns if col not in columns]
+
+    # Stack each category across all teams (long form), indexed by team and date
+    stat_frames = []
+    dimension_frames = []
+    for link_text in link_texts:
+        frames = [tables[(team_name, link_text)] for team_name in team_order if (team_name, link_text) in tables]
+        if not frames:
+            continue
+        stacked = pd.concat(frames, ignore_index=True).set_index(KEY_COLUMNS)
+        dimension_frames.append(stacked[["Opponent", "Result"]])
+        stat_frames.append(stacked.drop(columns=["Opponent", "Result"]))
+
+    # Opponent and Result come from the first category that has the game, like the merge chain
+    dimensions = pd.concat(dimension_frames).groupby(level=KEY_COLUMNS, sort=False).first()
+
+    # One outer join of every category on (TeamNM, Date)
+    wide = pd.concat([dimensions] + stat_frames, axis=1, join="outer").reset_index()
+
+    # Rows in team file order, then by Date within each team (as CombineAllTeamsData.py sorts them)
+    team_rank = wide["TeamNM"].map({name: rank for rank, name in enumerate(team_order)})
+    wide = wide.assign(_team_rank=team_rank, _game_date=game_dates(wide["Date"]))
+    wide = wide.sort_values(["_team_rank", "_game_date"], kind="stable")
+    wide = wide[columns].reset_index(drop=True)
+
+    combined_df = add_derived_metrics(wide)
+    combined_df.fillna(0, inplace=True)
+    return combined_df
+
+
+def combine_directory(input_directory=OUTPUT_DIRECTORY, team_names=None, link_texts=None):
+    team_names = team_names if team_names is not None else [team['name'] for team in load_active_teams()]
+    link_texts = link_texts if link_texts is not None else load_active_link_texts()
+    tables = read_category_tables(team_names, link_texts, input_directory)
+    return combine_tables(tables, team_names, link_texts)
+
+
+def verify_against(combined_df, golden_filepath):
+    # Golden-file check: the engine's CSV must match the reference file byte for byte
+    with tempfile.TemporaryDirectory() as temp_directory:
+        output_filepath = os.path.join(temp_directory, "All_Teams_Combined.csv")
+        combined_df.to_csv(output_filepath, index=False)
+        if filecmp.cmp(output_filepath, golden_filepath, shallow=False):
+            return True
+        shutil.copy(output_filepath, f"{golden_filepath}.engine")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build All_Teams_Combined.csv from the category tables in one pass.")
+    parser.add_argument("--verify", action="store_true",
+                        help="Compare with the existing All_Teams_Combined.csv instead of overwriting it.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    combined_df = combine_directory()
+    if combined_df is None:
+        print("No active team files found to combine.")
+        return
+    print(f"Combined {combined_df.shape} in {time.perf_counter() - started:.2f}s")
+
+    output_filepath = os.path.join(OUTPUT_DIRECTORY, "All_Teams_Combined.csv")
+    if args.verify:
+        if verify_against(combined_df, output_filepath):
+            print(f"Output is identical to {output_filepath}")
+        else:
+            print(f"Output differs from {output_filepath}; engine output written to {output_filepath}.engine")
+            raise SystemExit(1)
+    else:
+        combined_df.to_csv(output_filepath, index=False)
+        print(f"All teams combined file saved as {output_filepath} with shape {combined_df.shape}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,103 @@
+import argparse
 import os
 import pandas as pd
+from ScrapeCommon import OUTPUT_DIRECTORY, combined_filename, load_active_link_texts, load_active_teams, table_filename
+import TableStore
+import Telemetry
 
-# Step 1: Load the link texts from the CSV file and filter for active links
-link_texts_df = pd.read_csv('link_texts.csv')
-link_texts = link_texts_df[link_texts_df['active'] == 1]['link_text'].tolist()
 
-# Step 2: Load the teams from the CSV file and filter for active teams
-teams_df = pd.read_csv('teams.csv')
-teams = teams_df[teams_df['active'] == 1].to_dict(orient='records')
+def load_team_tables(team_name, link_texts, source="csv", output_directory=OUTPUT_DIRECTORY):
+    # Load each category table for a team, in link order, from the CSV files or the columnar store; the rows
+    # and bytes read are recorded per (team, category) in the run's telemetry
+    tables = []
+    for link_text in link_texts:
+        filename = table_filename(team_name, link_text)
+        with Telemetry.current().unit(team_name, link_text) as unit:
+            if source == "parquet":
+                df = TableStore.read_category_table(team_name, link_text)
+            else:
+                filepath = os.path.join(output_directory, filename)
+                df = pd.read_csv(filepath) if os.path.exists(filepath) else None
+                if df is not None:
+                    unit.add(bytes=os.path.getsize(filepath))
+
+            if df is None:
+                unit.set(status="missing")
+                print(f"File {filename} not found.")
+                continue
+            unit.add(rows=len(df))
+        tables.append(df)
+    return tables
 
-# Directory where the CSV files are saved
-output_directory = "./TeamDataFiles"  # Adjust this if files are saved in a different directory
 
-# Step 3: Loop through each active team
-for team in teams:
+def combine_team_tables(tables):
     combined_df = None  # Initialize an empty DataFrame for combining
 
-    # Step 4: Loop through each active link text to load and combine the corresponding CSV files
-    for link_text in link_texts:
-        # Construct the filename based on the team name and link text
-        filename = f"{team['name'].replace(' ', '_')}_{link_text.replace(' ', '_')}_Table_4.csv"
-        filepath = os.path.join(output_directory, filename)
-
-        # Load the CSV file into a DataFrame
-        if os.path.exists(filepath):
-            df = pd.read_csv(filepath)
-            print(f"Loaded {filename} with shape {df.shape}")
-
-            # If this is the first file, keep the "Result" column
-            if combined_df is None:
-                combined_df = df  # Initialize with the first DataFrame
-            else:
-                # Drop the "Result" column from the new DataFrame before merging
-                df = df.drop(columns=["Result", "Opponent"])
-                # Merge the data horizontally on TeamNM, Date, and Opponent
-                merge_columns = ["TeamNM", "Date"]
-                combined_df = pd.merge(combined_df, df, on=merge_columns, how="outer")
+    for df in tables:
+        # If this is the first file, keep the "Result" column
+        if combined_df is None:
+            combined_df = df  # Initialize with the first DataFrame
         else:
-            print(f"File {filename} not found.")
-
-    # Step 5: Save the combined DataFrame for the team
-    if combined_df is not None:
-        combined_filename = f"{team['name'].replace(' ', '_')}_Combined.csv"
-        combined_filepath = os.path.join(output_directory, combined_filename)
-        combined_df.to_csv(combined_filepath, index=False)
-        print(f"Combined file saved as {combined_filename} with shape {combined_df.shape}")
-    else:
-        print(f"No data to combine for team {team['name']}.")
+            # Drop the "Result" column from the new DataFrame before merging
+            df = df.drop(columns=["Result", "Opponent"])
+            # Merge the data horizontally on TeamNM, Date, and Opponent
+            merge_columns = ["TeamNM", "Date"]
+            combined_df = pd.merge(combined_df, df, on=merge_columns, how="outer")
+
+    return combined_df
+
+
+def save_team_combined(combined_df, team_name, fmt="csv", output_directory=OUTPUT_DIRECTORY):
+    if fmt == "parquet":
+        return TableStore.write_frame(combined_df, TableStore.combined_team_path(team_name))
+    combined_filepath = os.path.join(output_directory, combined_filename(team_name))
+    combined_df.to_csv(combined_filepath, index=False)
+    return combined_filepath
+
+
+def combine_teams(teams, link_texts, fmt="csv", output_directory=OUTPUT_DIRECTORY):
+    """Combine and save each team's category tables; returns {team name: wide DataFrame}."""
+    combined = {}
+    for team in teams:
+        tables = load_team_tables(team['name'], link_texts, source=fmt, output_directory=output_directory)
+        combined_df = combine_team_tables(tables)
+
+        # Save the combined DataFrame for the team
+        if combined_df is not None:
+            combined_filepath = save_team_combined(combined_df, team['name'], fmt=fmt,
+                                                   output_directory=output_directory)
+            print(f"Combined file saved as {combined_filepath} with shape {combined_df.shape}")
+            combined[team['name']] = combined_df
+        else:
+            print(f"No data to combine for team {team['name']}.")
+    return combined
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge each team's category tables into one wide table.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Read and write TeamDataFiles/ CSVs or the TableStore/ columnar store.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only rebuild teams whose category tables changed since the last run (CSV only).")
+    args = parser.parse_args()
+    if args.incremental and args.format != "csv":
+        parser.error("--incremental works with --format csv")
+
+    # Step 1: Load the active link texts and teams
+    link_texts = load_active_link_texts()
+    teams = load_active_teams()
+
+    # Step 2: Combine each active team's category tables and save the result
+    with Telemetry.run("CombineIndividualTeamFiles") as telemetry, telemetry.stage("combine_teams"):
+        if args.incremental:
+            from IncrementalCombine import combine_teams_incremental, load_combine_manifest, save_combine_manifest
+            manifest = load_combine_manifest()
+            rebuilt = combine_teams_incremental(teams, link_texts, manifest)
+            save_combine_manifest(manifest)
+            print(f"Rebuilt {len(rebuilt)} of {len(teams)} team(s); the others were unchanged.")
+        else:
+            combine_teams(teams, link_texts, fmt=args.format)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import numpy as np
+import pandas as pd
+from TableStore import all_teams_combined_path, read_combined_file
+
+STAT_LIST_PATH = "StatList.csv"
+
+# Columns the dashboard reads besides the StatList.csv stats (materialized by CombineAllTeamsData.py)
+DASHBOARD_COLUMNS = ["Opponent_Label", "Game Number", "Game Label"]
+
+# Text columns stored as categoricals: these always (they repeat across seasons), others when they have
+# fewer distinct values than CATEGORY_RATIO of the rows
+CATEGORY_COLUMNS = ["TeamNM", "Opponent"]
+CATEGORY_RATIO = 0.5
+
+
+def stat_list_columns(stat_list_path=STAT_LIST_PATH):
+    # Active StatList.csv columns (Dimension first, as listed) plus the dashboard's label columns
+    statlist_df = pd.read_csv(stat_list_path)
+    columns = statlist_df[statlist_df['Active'] == 1]['Column'].tolist()
+    return columns + [column for column in DASHBOARD_COLUMNS if column not in columns]
+
+
+def _decimals(values, most=6):
+    # Fewest decimal places that reproduce every value, or None if more than `most` are needed
+    for decimals in range(most + 1):
+        if np.array_equal(np.round(values, decimals), values):
+            return decimals
+    return None
+
+
+def compact_frame(df):
+    """Return `df` with low-cardinality text as categoricals and numbers in the narrowest exact dtype.
+
+    Integers (and floats that only hold whole numbers) become the smallest integer type; other floats become
+    float32 when rounding the float32 value to the column's decimal places gives back the original. The
+    original dtypes and decimal places are kept in `attrs` for widen().
+    """
+    compact = {}
+    original_dtypes = {}
+    decimals = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object:
+            if column in CATEGORY_COLUMNS or values.nunique() < CATEGORY_RATIO * len(values):
+                values = values.astype("category")
+        elif pd.api.types.is_integer_dtype(values):
+            values = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_float_dtype(values) and values.notna().all():
+            column_decimals = _decimals(values.to_numpy())
+            if column_decimals == 0 and values.abs().max() < 2 ** 31:
+                values = pd.to_numeric(values.astype(np.int64), downcast="integer")
+            elif column_decimals is not None and np.array_equal(
+                    np.round(values.to_numpy(dtype=np.float32).astype(np.float64), column_decimals), values):
+                values = values.astype(np.float32)
+                decimals[column] = column_decimals
+
+        if values.dtype != df[column].dtype:
+            original_dtypes[column] = str(df[column].dtype)
+        compact[column] = values
+
+    compact_df = pd.DataFrame(compact, index=df.index)
+    compact_df.attrs["original_dtypes"] = original_dtypes
+    compact_df.attrs["decimals"] = decimals
+    return compact_df
+
+
+def widen(df):
+    """Restore the original dtypes (and exact float values) of a compact frame, e.g. rows about to be plotted."""
+    original_dtypes = {column: dtype for column, dtype in df.attrs.get("original_dtypes", {}).items()
+                       if column in df.columns}
+    if not original_dtypes:
+        return df
+    decimals = {column: places for column, places in df.attrs.get("decimals", {}).items() if column in df.columns}
+    return df.astype(original_dtypes).round(decimals)
+
+
+def load_compact(path=None, stat_list_path=STAT_LIST_PATH):
+    """Load only the active StatList.csv columns of All_Teams_Combined and compact them."""
+    path = path or all_teams_combined_path()
+    return compact_frame(read_combined_file(path, columns=stat_list_columns(stat_list_path)))
+
+
+def memory_report(path=None, stat_list_path=STAT_LIST_PATH):
+    path = path or all_teams_combined_path()
+    full_df = read_combined_file(path)
+    compact_df = load_compact(path, stat_list_path)
+    before = full_df.memory_usage(deep=True).sum()
+    after = compact_df.memory_usage(deep=True).sum()
+    print(f"{path}: {full_df.shape[1]} columns, {before / 1024:.0f} KiB as loaded by default")
+    print(f"  compact: {compact_df.shape[1]} active columns, {after / 1024:.0f} KiB ({after / before:.0%})")
+    print(f"  dtypes: {compact_df.dtypes.astype(str).value_counts().to_dict()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the memory used by the compact dashboard frame.")
+    parser.add_argument("--path", help="All_Teams_Combined file (default: the one the dashboard loads).")
+    args = parser.parse_args()
+
+    memory_report(args.path)
@@ -0,0 +1,134 @@
+import hashlib
+import os
+import pandas as pd
+import streamlit as st
+from ColumnStore import open_column_store
+from DashboardFigures import FigureCache
+from GameIndex import GameIndex
+from ScheduleGrid import ScheduleHtmlCache, build_schedule_grid, schedule_html
+from TableStore import all_teams_combined_path
+
+STAT_LIST_PATH = "StatList.csv"
+TEAM_COLORS_PATH = "TeamColors.csv"
+TEAMS_PATH = "teams.csv"
+SCHEDULE_PATH = "Schedule2024.csv"
+
+# path -> (mtime_ns, size, sha256); the content is only re-hashed when the file's mtime or size changes
+_fingerprints = {}
+
+
+def file_fingerprint(path):
+    """Content hash of `path`, used as the cache key so a rewritten-but-identical file keeps its cache."""
+    stat = os.stat(path)
+    known = _fingerprints.get(path)
+    if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        return known[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    _fingerprints[path] = (stat.st_mtime_ns, stat.st_size, digest.hexdigest())
+    return digest.hexdigest()
+
+
+# The loaders below are shared across sessions. `fingerprint` is only part of the cache key: a new value
+# (the file changed) forces a reload.
+
+# The games index is one shared, read-only object (no per-rerun copy of the full frame); its queries return
+# new frames. The other loaders hand each caller its own copy.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_games(path, fingerprint, stat_list_fingerprint):
+    # Dimension columns in memory; the active StatList.csv stats are mapped from the column store when a
+    # chart first asks for them (see ColumnStore.py)
+    column_store = open_column_store(path, fingerprint, STAT_LIST_PATH)
+    df = column_store.dimensions()
+    print(f"Loaded {path} dimensions with shape {df.shape} in {df.memory_usage(deep=True).sum() / 1024:.0f} KiB, "
+          f"{len(column_store.stat_columns)} stat columns on demand")
+    return GameIndex(df, column_store=column_store)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_stat_catalog(path, fingerprint):
+    statlist_df = pd.read_csv(path)
+
+    # Filter active columns and exclude the "Dimension" category
+    active_stats = statlist_df[(statlist_df['Active'] == 1) & (statlist_df['Category'] != 'Dimension')]
+
+    # Create a dictionary to hold categorized stats, with an "All Stats" category that includes them all
+    categories = active_stats['Category'].unique()
+    categorized_stats = {category: active_stats[active_stats['Category'] == category]['ShortName'].tolist()
+                         for category in categories}
+    categorized_stats['All Stats'] = active_stats['ShortName'].tolist()
+
+    return {
+        "active_stats": active_stats,
+        "column_mapping": dict(zip(active_stats['Column'], active_stats['ShortName'])),
+        "categories": categories,
+        "categorized_stats": categorized_stats,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _read_csv(path, fingerprint):
+    return pd.read_csv(path)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _load_schedule(path, fingerprint):
+    schedule_df = pd.read_csv(path)
+
+    # Convert the 'Start Date' column to datetime format and add the day of the week abbreviation
+    schedule_df['Start Date'] = pd.to_datetime(schedule_df['Start Date'])
+    schedule_df['Day'] = schedule_df['Start Date'].dt.strftime('%a')
+    return schedule_df
+
+
+# Plotly figures as JSON, shared by every session
+@st.cache_resource(show_spinner=False)
+def figure_cache():
+    return FigureCache(max_bytes=64 * 1024 * 1024)
+
+
+# Rendered schedule tables, shared by every session
+@st.cache_resource(show_spinner=False)
+def schedule_html_cache():
+    return ScheduleHtmlCache(max_entries=256)
+
+
+def load_games():
+    """GameIndex over the dimensions of All_Teams_Combined (the columnar store's file or the CSV file,
+    whichever was written last) with its stat columns loaded on demand; reloaded when that file or
+    StatList.csv changes."""
+    path = all_teams_combined_path()
+    return _load_games(path, file_fingerprint(path), file_fingerprint(STAT_LIST_PATH))
+
+
+def data_version():
+    # Changes whenever anything a stats chart is drawn from changes: the stats, StatList.csv or the colors
+    return (file_fingerprint(all_teams_combined_path()), file_fingerprint(STAT_LIST_PATH),
+            file_fingerprint(TEAM_COLORS_PATH))
+
+
+def load_stat_catalog(path=STAT_LIST_PATH):
+    """Active stats from StatList.csv: active_stats, column_mapping, categories and categorized_stats."""
+    return _load_stat_catalog(path, file_fingerprint(path))
+
+
+def load_team_colors(path=TEAM_COLORS_PATH):
+    return _read_csv(path, file_fingerprint(path))
+
+
+def load_teams(path=TEAMS_PATH):
+    return _read_csv(path, file_fingerprint(path))
+
+
+def load_schedule(path=SCHEDULE_PATH):
+    return _load_schedule(path, file_fingerprint(path))
+
+
+def render_schedule(selected_teams):
+    """HTML schedule grid for the selected teams, rendered once per schedule, colors and selection."""
+    return schedule_html_cache().render(
+        file_fingerprint(SCHEDULE_PATH), selected_teams, file_fingerprint(TEAM_COLORS_PATH),
+        lambda: schedule_html(build_schedule_grid(load_schedule(), load_team_colors(), selected_teams)))
@@ -0,0 +1,181 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+from Decimation import decimate_by_team
+
+GRAPH_TYPES = ["Bar Chart", "Line Chart", "Area Chart", "Scatter Plot", "Box Plot"]
+
+# Line and scatter charts with at least this many points are drawn with WebGL (scattergl) instead of SVG
+WEBGL_POINT_THRESHOLD = 1000
+# Line and scatter charts with more points than this are decimated per team (LTTB) down to about this many
+MAX_CHART_POINTS = 5000
+
+
+def build_figure(filtered_df, column, stat_name, graph_type, x_axis, x_label, color_map, multiple_teams,
+                 webgl_threshold=WEBGL_POINT_THRESHOLD, max_points=MAX_CHART_POINTS):
+    # Large line and scatter charts: fewer points, drawn with WebGL (scatter trendlines still fit every game)
+    if graph_type in ("Line Chart", "Scatter Plot"):
+        plot_df = decimate_by_team(filtered_df, x_axis, column, max_points)
+        render_mode = 'webgl' if len(plot_df) >= webgl_threshold else 'svg'
+
+    # Plot data based on the selected graph type
+    if graph_type == "Bar Chart":
+        fig = px.bar(filtered_df, x=x_axis, y=column, color='TeamNM',
+                     text='Game Label' if multiple_teams else 'Opponent_Label',
+                     title=f'{stat_name} by {x_label}', color_discrete_map=color_map,
+                     template='simple_white')  # Apply theme
+
+        fig.update_layout(barmode='group')  # Set bar mode to 'group' for side-by-side bars
+
+    elif graph_type == "Line Chart":
+        fig = px.line(plot_df, x=x_axis, y=column, color='TeamNM', title=f'{stat_name} by {x_label}',
+                      markers=True, render_mode=render_mode, color_discrete_map=color_map,
+                      template='simple_white')  # Apply theme
+
+    elif graph_type == "Area Chart":
+        fig = px.area(filtered_df, x=x_axis, y=column, color='TeamNM', title=f'{stat_name} by {x_label}',
+                      color_discrete_map=color_map, template='simple_white')  # Apply theme
+
+    elif graph_type == "Scatter Plot":
+        fig = px.scatter(plot_df, x=x_axis, y=column, color='TeamNM', title=f'{stat_name} by {x_label}',
+                         render_mode=render_mode, color_discrete_map=color_map,
+                         template='simple_white')  # Apply theme
+        fig = add_trendlines(fig, filtered_df, x_axis, column, endpoints_only=plot_df is not filtered_df)
+
+    elif graph_type == "Box Plot":
+        fig = px.box(filtered_df, x='TeamNM', y=column, color='TeamNM', title=f'{stat_name} Distribution',
+                     color_discrete_map=color_map, template='simple_white')  # Apply theme
+
+    else:
+        raise ValueError(f"Unknown graph type: {graph_type}")
+
+    # Update layout for better readability and responsive design
+    fig.update_layout(
+        xaxis_title=x_label,
+        yaxis_title=stat_name,
+        yaxis=dict(range=[0, None]),  # Set lower boundary to 0
+        autosize=True,
+        margin=dict(l=20, r=20, t=50, b=20),  # Adjust margins for responsiveness
+        height=500,  # Set a base height
+        width=None  # Let the width be responsive
+    )
+    return fig
+
+
+def ols_fits(codes, x, y, groups):
+    """Least-squares line of y on x for every group at once.
+
+    `codes` gives each row's group (0 .. groups - 1). Returns slope, intercept and R² arrays indexed by
+    group code; groups with fewer than two rows get NaN. Sums are taken around the group means so that
+    large x values (dates as epoch seconds) don't lose precision.
+    """
+    counts = np.bincount(codes, minlength=groups).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.bincount(codes, weights=x, minlength=groups) / counts
+        mean_y = np.bincount(codes, weights=y, minlength=groups) / counts
+        dx = x - mean_x[codes]
+        dy = y - mean_y[codes]
+        sxx = np.bincount(codes, weights=dx * dx, minlength=groups)
+        sxy = np.bincount(codes, weights=dx * dy, minlength=groups)
+        syy = np.bincount(codes, weights=dy * dy, minlength=groups)
+
+        # A team whose x never changes gets a flat line through its mean
+        slope = np.where(sxx > 0, sxy / sxx, 0.0)
+        intercept = mean_y - slope * mean_x
+        r_squared = 1 - (syy - slope * sxy) / syy
+    slope[counts < 2] = np.nan
+    intercept[counts < 2] = np.nan
+    return slope, intercept, r_squared
+
+
+def add_trendlines(fig, filtered_df, x_axis, column, color_column='TeamNM', endpoints_only=False):
+    """Add an OLS trendline after each team's markers in a px.scatter figure, as trendline="ols" would.
+
+    All teams are fitted in one ols_fits() pass instead of one statsmodels regression per trace; the
+    traces keep px's naming, colors and hover text, and the markers' trace type (px uses WebGL for large data).
+    With `endpoints_only` each line is drawn through its first and last games only, for decimated charts.
+    """
+    data = filtered_df[[color_column, x_axis, column]].dropna()
+    x_raw = data[x_axis].to_numpy()
+    if x_raw.dtype.kind == 'M':
+        x = x_raw.astype('datetime64[ns]').astype(np.int64) / 10 ** 9  # Fit dates as epoch seconds like px
+    else:
+        x = x_raw.astype(np.float64)
+    y = data[column].to_numpy(dtype=np.float64)
+
+    # Sort by team, then x, so each team's trendline is a contiguous, ordered slice
+    codes, teams = pd.factorize(data[color_column])
+    order = np.lexsort((x, codes))
+    codes, x, y = codes[order], x[order], y[order]
+    x_raw = data[x_axis].iloc[order]  # Kept as a Series so dates serialize as px writes them
+    slope, intercept, r_squared = ols_fits(codes, x, y, len(teams))
+    fitted = intercept[codes] + slope[codes] * x
+    bounds = np.searchsorted(codes, np.arange(len(teams) + 1))
+    team_codes = {str(team): code for code, team in enumerate(teams)}
+
+    # Build the trendlines, then move each one right after its team's markers as px orders them
+    markers = fig.data
+    trendlines = {}
+    for number, trace in enumerate(markers):
+        code = team_codes.get(trace.name)
+        if code is None or bounds[code + 1] - bounds[code] < 2:
+            continue
+        rows = [bounds[code], bounds[code + 1] - 1] if endpoints_only else slice(bounds[code], bounds[code + 1])
+        hovertemplate = (f"<b>OLS trendline</b><br>{column} = {slope[code]:g} * {x_axis} + {intercept[code]:g}<br>"
+                         f"R<sup>2</sup>={r_squared[code]:f}<br><br>{color_column}={trace.name}<br>"
+                         f"{x_axis}=%{{x}}<br>{column}=%{{y}} <b>(trend)</b><extra></extra>")
+        trendlines[number] = type(trace)(x=x_raw.iloc[rows], y=fitted[rows], mode='lines', name=trace.name,
+                                         legendgroup=trace.legendgroup, marker=trace.marker, showlegend=False,
+                                         hovertemplate=hovertemplate, xaxis=trace.xaxis, yaxis=trace.yaxis)
+    fig.add_traces(list(trendlines.values()))
+    added = iter(fig.data[len(markers):])
+    fig.data = [trace for number, marker in enumerate(markers)
+                for trace in ((marker, next(added)) if number in trendlines else (marker,))]
+    return fig
+
+
+class FigureCache:
+    """Serialized Plotly figures keyed by everything that shapes them, evicted least recently used first
+    once the stored JSON exceeds `max_bytes`.
+
+    A key is (data version, teams, start date, end date, stat column, graph type); the data version should
+    change whenever the stats, StatList.csv or the team colors do.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def figure(self, key, build):
+        """Return the cached figure for `key`, or build() it (a Plotly figure) and cache its JSON."""
+        with self.lock:
+            figure_json = self.entries.get(key)
+            if figure_json is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if figure_json is not None:
+            return pio.from_json(figure_json)
+
+        fig = build()
+        figure_json = fig.to_json()
+        with self.lock:
+            if key not in self.entries and len(figure_json) <= self.max_bytes:
+                self.entries[key] = figure_json
+                self.total_bytes += len(figure_json)
+                while self.total_bytes > self.max_bytes:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.total_bytes -= len(evicted)
+        return fig
+
+    def stats(self):
+        return (f"figure cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} figures, "
+                f"{self.total_bytes / 1024:.0f} KiB")
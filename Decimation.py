@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+# Teams never get decimated below this many points, however many teams share a chart's budget
+MIN_POINTS_PER_TEAM = 20
+
+
+def _segment_positions(starts, counts):
+    # Concatenated ranges starts[k] .. starts[k] + counts[k] - 1, plus the segment each position belongs to
+    segments = np.repeat(np.arange(len(counts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return starts[segments] + offsets, segments
+
+
+def lttb_indices(x, y, starts, lengths, points):
+    """Largest-Triangle-Three-Buckets downsampling of several series at once.
+
+    `x` and `y` hold the series back to back, each sorted by x; series k is rows starts[k] .. starts[k] +
+    lengths[k] - 1 and must be longer than `points` (at least 3). Returns a (series, points) array of the
+    kept row positions, which include every series' first and last rows. The buckets are walked in order
+    (each pick depends on the previous one) but every step handles all series together.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    cumulative_x = np.concatenate(([0.0], np.cumsum(x)))
+    cumulative_y = np.concatenate(([0.0], np.cumsum(y)))
+    every = (lengths - 2) / (points - 2)
+
+    kept = np.empty((len(starts), points), dtype=np.int64)
+    kept[:, 0] = starts
+    kept[:, -1] = starts + lengths - 1
+    previous = starts
+    for bucket in range(points - 2):
+        # Average of the next bucket (the last bucket's "next" is the final point)
+        next_start = starts + np.floor((bucket + 1) * every).astype(np.int64) + 1
+        next_stop = np.minimum(starts + np.floor((bucket + 2) * every).astype(np.int64) + 1, starts + lengths)
+        next_count = next_stop - next_start
+        average_x = (cumulative_x[next_stop] - cumulative_x[next_start]) / next_count
+        average_y = (cumulative_y[next_stop] - cumulative_y[next_start]) / next_count
+
+        # Pick the point of this bucket making the largest triangle with the previous pick and that average
+        bucket_start = starts + np.floor(bucket * every).astype(np.int64) + 1
+        bucket_count = starts + np.floor((bucket + 1) * every).astype(np.int64) + 1 - bucket_start
+        positions, segments = _segment_positions(bucket_start, bucket_count)
+        anchor_x = x[previous][segments]
+        anchor_y = y[previous][segments]
+        area = np.abs((anchor_x - average_x[segments]) * (y[positions] - anchor_y) -
+                      (anchor_x - x[positions]) * (average_y[segments] - anchor_y))
+
+        # First position holding each segment's largest area
+        order = np.lexsort((-area, segments))
+        first = np.searchsorted(segments[order], np.arange(len(starts)))
+        previous = positions[order[first]]
+        kept[:, bucket + 1] = previous
+    return kept
+
+
+def decimate_by_team(df, x_axis, column, max_points, team_column='TeamNM', min_points_per_team=MIN_POINTS_PER_TEAM):
+    """Rows of `df` to plot `column` against `x_axis` with about `max_points` points in all.
+
+    Each team gets an equal share of the budget (at least `min_points_per_team`); teams with more rows than
+    their share are reduced with LTTB, which keeps the peaks and troughs a line chart shows. Rows without
+    a value are dropped from reduced teams. Returns `df` itself when it already fits.
+    """
+    if len(df) <= max_points:
+        return df
+    teams = df[team_column].nunique()
+    points = max(max_points // max(teams, 1), min_points_per_team, 3)
+
+    x = df[x_axis].to_numpy()
+    x = x.astype('datetime64[ns]').astype(np.int64) / 10 ** 9 if x.dtype.kind == 'M' else x.astype(np.float64)
+    y = df[column].to_numpy(dtype=np.float64)
+    codes, _ = pd.factorize(df[team_column])
+    present = ~(np.isnan(x) | np.isnan(y))
+
+    # Sort by team then x; rows of teams within their share are kept as they are (missing values included)
+    order = np.lexsort((x, codes))
+    counts = np.bincount(codes[present], minlength=codes.max() + 1)
+    reduce = counts[codes[order]] > points
+    keep = order[~reduce]
+
+    reduced = order[reduce & present[order]]
+    if len(reduced):
+        reduced_codes = codes[reduced]
+        starts = np.flatnonzero(np.r_[True, reduced_codes[1:] != reduced_codes[:-1]])
+        lengths = np.diff(np.r_[starts, len(reduced)])
+        kept = lttb_indices(x[reduced], y[reduced], starts, lengths, points)
+        keep = np.concatenate((keep, reduced[kept.ravel()]))
+    return df.iloc[np.sort(keep)]
@@ -0,0 +1,146 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from HttpScrape import saved_page_filename
+
+
+class Faults:
+    """Failures injected into the served pages, to exercise the scrapers' retries, backoff and timeouts.
+
+    Each page answers its first `throttle` requests with 429 Too Many Requests (with a Retry-After of
+    `retry_after` seconds) and its next `errors` requests with 503 Service Unavailable. Every response waits
+    `delay` seconds first (more than the client's timeout makes it time out). Each request's time, path and
+    status is kept in `requests`.
+    """
+
+    def __init__(self, throttle=0, errors=0, delay=0.0, retry_after=1):
+        self.throttle = throttle
+        self.errors = errors
+        self.delay = delay
+        self.retry_after = retry_after
+        self.counts = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def status_for(self, path):
+        # None when the page should be served normally
+        with self.lock:
+            count = self.counts.get(path, 0)
+            self.counts[path] = count + 1
+        if count < self.throttle:
+            return 429
+        if count < self.throttle + self.errors:
+            return 503
+        return None
+
+    def record(self, path, status):
+        with self.lock:
+            self.requests.append((time.monotonic(), path, status))
+
+
+def make_handler(directory, faults=None):
+    class SavedPageHandler(BaseHTTPRequestHandler):
+        # Serves /players/{id} and /players/{id}?year_stat_category_id={cid} from pages saved with --save-html
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+
+        def do_GET(self):
+            try:
+                if faults is not None and self.inject_fault():
+                    return
+                self.serve_page()
+            except ConnectionError:
+                pass  # The client gave up (e.g. timed out) before the response was sent
+
+        def inject_fault(self):
+            # True when a throttled or failed response was sent instead of the page
+            if faults.delay:
+                time.sleep(faults.delay)
+            status = faults.status_for(self.path)
+            if status is None:
+                return False
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", str(faults.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return True
+
+        def send_response(self, code, message=None):
+            if faults is not None:
+                faults.record(self.path, code)
+            super().send_response(code, message)
+
+        def serve_page(self):
+            parsed = urlparse(self.path)
+            parts = parsed.path.strip("/").split("/")
+            category_id = parse_qs(parsed.query).get("year_stat_category_id", [None])[0]
+
+            filepath = None
+            if len(parts) == 2 and parts[0] == "players":
+                filepath = os.path.join(directory, saved_page_filename(parts[1], category_id))
+
+            if filepath is None or not os.path.exists(filepath):
+                self.send_error(404, "Page not saved")
+                return
+
+            with open(filepath, "rb") as f:
+                body = f.read()
+
+            # Support conditional requests so the page cache's revalidation can be exercised
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scraper output readable
+
+    return SavedPageHandler
+
+
+def start_server(directory, port=0, faults=None):
+    """Start the fixture server on a background thread and return it; server.server_port holds the port.
+    `faults` (a Faults) injects throttled, failing or slow responses."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(directory, faults))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved stats.ncaa.org pages for offline scraper runs.")
+    parser.add_argument("--directory", default="SavedPages", help="Directory written by ScrapeNCAA.py --save-html.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--throttle", type=int, default=0, metavar="N",
+                        help="Answer each page's first N requests with 429 Too Many Requests.")
+    parser.add_argument("--errors", type=int, default=0, metavar="N",
+                        help="Then answer each page's next N requests with 503 Service Unavailable.")
+    parser.add_argument("--delay", type=float, default=0.0, metavar="SECONDS",
+                        help="Wait this long before every response (more than the scraper's timeout to test it).")
+    parser.add_argument("--retry-after", type=int, default=1, metavar="SECONDS",
+                        help="Retry-After header sent with the 429 responses.")
+    args = parser.parse_args()
+
+    faults = None
+    if args.throttle or args.errors or args.delay:
+        faults = Faults(args.throttle, args.errors, args.delay, args.retry_after)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.directory, faults))
+    print(f"Serving {args.directory} at http://127.0.0.1:{args.port}")
+    if faults is not None:
+        print(f"Injecting {args.throttle} throttled and {args.errors} failed response(s) per page, "
+              f"{args.delay}s delay")
+    print(f"Run: python ScrapeNCAA.py --backend http --base-url http://127.0.0.1:{args.port}")
+    server.serve_forever()
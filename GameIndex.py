@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+
+class GameIndex:
+    """In-memory index over a games frame such as All_Teams_Combined.
+
+    The frame is sorted once by team and date, so each team's games are one contiguous row range
+    (team -> (start, stop)) and the dates inside it can be binary searched. A query is a dictionary
+    lookup and two searchsorted calls per team instead of a scan and sort of the whole frame.
+
+    With a ColumnStore, `df` holds only the dimension columns in the store's row order, which is kept
+    rather than re-sorted, and the stat columns a query asks for are read from the store for just the
+    matching rows.
+    """
+
+    def __init__(self, df, team_column="TeamNM", date_column="Date", column_store=None):
+        self.column_store = column_store
+        self.date_column = date_column
+        if column_store is None:
+            self.frame = df.sort_values([team_column, date_column], kind="stable").reset_index(drop=True)
+        else:
+            # Row positions index the store's columns, so the store's order is kept (and checked below)
+            self.frame = df.reset_index(drop=True)
+        teams = self.frame[team_column].to_numpy()
+        self.dates = self.frame[date_column].to_numpy(dtype="datetime64[ns]")
+
+        # A team's range starts wherever the team name differs from the previous row's
+        starts = np.flatnonzero(np.r_[True, teams[1:] != teams[:-1]]) if len(teams) else np.empty(0, dtype=int)
+        stops = np.r_[starts[1:], len(teams)]
+        self.ranges = {teams[start]: (start, stop) for start, stop in zip(starts, stops)}
+
+        if column_store is not None:
+            # Each team must be one run of rows with its dates in order, or queries would return wrong rows
+            date_drops = np.flatnonzero(self.dates[1:] < self.dates[:-1]) + 1
+            if len(self.ranges) != len(starts) or not np.isin(date_drops, starts).all():
+                raise ValueError(f"Column store {column_store.directory} rows are not grouped by team and "
+                                 f"sorted by date within each team")
+
+    @property
+    def teams(self):
+        return list(self.ranges)
+
+    @property
+    def min_date(self):
+        return self.frame[self.date_column].min()
+
+    @property
+    def max_date(self):
+        return self.frame[self.date_column].max()
+
+    def positions(self, teams, start_date=None, end_date=None):
+        """Row positions of `teams`' games between the dates (inclusive), by team then date."""
+        parts = []
+        for team in sorted(set(teams)):
+            if team not in self.ranges:
+                continue
+            start, stop = self.ranges[team]
+            dates = self.dates[start:stop]
+            low = start if start_date is None else \
+                start + np.searchsorted(dates, pd.Timestamp(start_date).to_datetime64(), side="left")
+            high = stop if end_date is None else \
+                start + np.searchsorted(dates, pd.Timestamp(end_date).to_datetime64(), side="right")
+            parts.append(np.arange(low, high))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.intp)
+
+    def query(self, teams, start_date=None, end_date=None, columns=None):
+        """Games of `teams` between the dates, by team then date, with the stored `columns` added."""
+        positions = self.positions(teams, start_date, end_date)
+        rows = self.frame.iloc[positions]
+        lazy_columns = [column for column in columns or [] if column not in rows.columns]
+        if not lazy_columns:
+            return rows
+        stats = self.column_store.take(lazy_columns, positions, index=rows.index)
+        result = pd.concat([rows, stats], axis=1)
+        result.attrs = rows.attrs
+        return result
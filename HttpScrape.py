@@ -0,0 +1,208 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from ScrapeCommon import new_summary, parse_table_4
+from ScrapeManifest import count_games, is_team_current, write_table
+import Telemetry
+
+BASE_URL = "https://stats.ncaa.org"
+
+# stats.ncaa.org rejects the default python-requests user agent
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36 Edg/128.0.0.0")
+
+
+def create_session(concurrency=4, retries=3, backoff=1.0):
+    """Create a keep-alive session whose connection pool matches the request concurrency.
+
+    Failed requests (connection errors, 429 and 5xx responses) are retried with exponential backoff.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency, max_retries=retry)
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def team_url(team_id, base_url=BASE_URL):
+    return f"{base_url}/players/{team_id}"
+
+
+def category_url(team_id, category_id, base_url=BASE_URL):
+    return f"{base_url}/players/{team_id}?year_stat_category_id={category_id}"
+
+
+def resolve_category_ids(html, link_texts):
+    # Map each link text on the team page to the year_stat_category_id in its href
+    soup = BeautifulSoup(html, "html.parser")
+    category_ids = {}
+    for link in soup.find_all("a", href=True):
+        link_text = link.text.strip()
+        if link_text in link_texts and link_text not in category_ids:
+            query = parse_qs(urlparse(link["href"]).query)
+            if "year_stat_category_id" in query:
+                category_ids[link_text] = query["year_stat_category_id"][0]
+    return category_ids
+
+
+def saved_page_filename(team_id, category_id=None):
+    # Naming shared with FixtureServer.py so saved pages can be served back locally
+    return f"{team_id}.html" if category_id is None else f"{team_id}_{category_id}.html"
+
+
+def fetch_page(session, url, timeout=30, cache=None, team=None, category=None, replay=False, metrics=None):
+    # Read through the page cache when one is given; replay mode never touches the network. Requests sent
+    # are counted on `metrics` (a Telemetry unit) when given
+    if cache is None:
+        response = session.get(url, timeout=timeout)
+        if metrics is not None:
+            metrics.add(requests=1)
+        response.raise_for_status()
+        return response.text
+
+    html, entry = cache.lookup(url, team, category, replay=replay)
+    if html is not None:
+        return html
+
+    response = session.get(url, headers=cache.conditional_headers(entry), timeout=timeout)
+    if metrics is not None:
+        metrics.add(requests=1)
+    if response.status_code == 304 and entry is not None:
+        cache.mark_revalidated(entry)
+        return cache.read(entry)
+    response.raise_for_status()
+    cache.put(url, response.text, team, category,
+              etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+    return response.text
+
+
+def save_page(html, save_html_dir, team_id, category_id=None):
+    os.makedirs(save_html_dir, exist_ok=True)
+    with open(os.path.join(save_html_dir, saved_page_filename(team_id, category_id)), "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def scrape_teams_http(teams, link_texts, base_url=BASE_URL, concurrency=4, save_html_dir=None,
+                      manifest=None, incremental=False, cache=None, replay=False, fmt="csv", log=print,
+                      journal=None):
+    """Fetch every team page once, resolve its category ids, then pull all category pages concurrently.
+
+    Each category's outcome is checkpointed in `journal` (a ScrapeJournal) when given, from the pool thread
+    as soon as it is stored. Returns one summary dict per team in the same shape as ScrapeNCAA.scrape_team.
+    """
+    session = create_session(concurrency=concurrency)
+    summaries = {team['name']: new_summary(team['name'], "http") for team in teams}
+
+    def fetch_team(team):
+        with Telemetry.current().unit(team['name']) as unit:
+            html = fetch_page(session, team_url(team['id'], base_url), cache=cache, team=team['name'], replay=replay,
+                              metrics=unit)
+            unit.add(bytes=len(html.encode("utf-8")))
+            if save_html_dir:
+                save_page(html, save_html_dir, team['id'])
+            return resolve_category_ids(html, link_texts), count_games(html)
+
+    def fetch_category(team, link_text, category_id):
+        # Runs on a pool thread; returns ("saved", table) or ("empty", None) and leaves the bookkeeping to the caller.
+        with Telemetry.current().unit(team['name'], link_text) as unit:
+            html = fetch_page(session, category_url(team['id'], category_id, base_url),
+                              cache=cache, team=team['name'], category=link_text, replay=replay, metrics=unit)
+            unit.add(bytes=len(html.encode("utf-8")))
+            if save_html_dir:
+                save_page(html, save_html_dir, team['id'], category_id)
+
+            df = parse_table_4(html, team['name'], link_text)
+            if df is None:
+                unit.set(status="empty")
+                if journal is not None:
+                    journal.done(team['name'], link_text)
+                return "empty", None
+
+            unit.add(rows=len(df))
+            table = write_table(df, team['name'], link_text, incremental=incremental, fmt=fmt)
+            if journal is not None:
+                journal.done(team['name'], link_text, table)
+            return "saved", table
+
+    def timed(function, *args):
+        started = time.perf_counter()
+        try:
+            return function(*args), time.perf_counter() - started
+        except Exception as e:
+            e.seconds = time.perf_counter() - started
+            raise
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Step 1: Resolve the category ids from each team page
+        team_futures = [(team, executor.submit(timed, fetch_team, team)) for team in teams]
+
+        # Step 2: Fetch every category page through the same bounded pool
+        category_futures = []
+        for team, future in team_futures:
+            summary = summaries[team['name']]
+            try:
+                (category_ids, summary["games"]), seconds = future.result()
+                summary["seconds"] += seconds
+            except Exception as e:
+                log(f"Error loading team page for {team['name']}: {e}")
+                summary["errors"].extend(link_texts)
+                if journal is not None:
+                    for link_text in link_texts:
+                        journal.failed(team['name'], link_text, e)
+                continue
+            if journal is not None:
+                journal.team_page(team['name'], summary["games"])
+
+            if incremental and is_team_current(manifest, team['name'], summary["games"], link_texts):
+                log(f"No new games for team {team['name']}, skipping.")
+                summary["skipped"] = True
+                if journal is not None:
+                    journal.skipped(team['name'], link_texts)
+                continue
+
+            log(f"Resolved {len(category_ids)} category ids for team {team['name']}.")
+            for link_text in link_texts:
+                if link_text in category_ids:
+                    future = executor.submit(timed, fetch_category, team, link_text, category_ids[link_text])
+                    category_futures.append((team, link_text, future))
+                else:
+                    log(f"Link {link_text} not found on the team page for {team['name']}.")
+                    summary["errors"].append(link_text)
+                    if journal is not None:
+                        journal.failed(team['name'], link_text, "link not found on the team page")
+
+        # Step 3: Merge the per-category results into the team summaries
+        for team, link_text, future in category_futures:
+            summary = summaries[team['name']]
+            try:
+                (status, table), seconds = future.result()
+                summary[status] += 1
+                if table is not None:
+                    summary["tables"][link_text] = table
+                summary["seconds"] += seconds
+            except Exception as e:
+                log(f"Error processing {link_text} for team {team['name']}: {e}")
+                summary["errors"].append(link_text)
+                summary["seconds"] += getattr(e, "seconds", 0.0)
+                if journal is not None:
+                    journal.failed(team['name'], link_text, e)
+
+    session.close()
+
+    for summary in summaries.values():
+        summary["seconds"] = round(summary["seconds"], 1)
+    return list(summaries.values())
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from CombineAllTeamsData import add_derived_metrics, combine_all_teams, sort_by_date
+from CombineIndividualTeamFiles import combine_team_tables, load_team_tables, save_team_combined
+from ScrapeCommon import OUTPUT_DIRECTORY, combined_filename, table_filename
+from TableStore import STORE_DIRECTORY
+import Telemetry
+
+COMBINE_MANIFEST_PATH = os.path.join(OUTPUT_DIRECTORY, "combine_manifest.json")
+
+# Each team's rows of All_Teams_Combined (derived metrics added), as computed on the last run
+DERIVED_DIRECTORY = os.path.join(STORE_DIRECTORY, "derived")
+
+# Code and settings each step depends on; when one changes, that step is redone for every team
+MERGE_FILES = ["CombineIndividualTeamFiles.py"]
+DERIVE_FILES = ["CombineAllTeamsData.py", "MetricsEngine.py", "ResultParsing.py", "MetricDefinitions.csv"]
+
+
+def file_hash(path):
+    # Content hash of a file, or None if it doesn't exist
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def config_hash(paths, extra=""):
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for path in paths:
+        digest.update(f"{path}\0{file_hash(path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_combine_manifest(path=COMBINE_MANIFEST_PATH):
+    # {"teams": {team: {"tables": {link_text: hash}, "merge_config", "combined", "derived_from", "derived_config",
+    #                    "signature", "rows"}},
+    #  "output": {"key", "hash", "teams": [[team, rows], ...]}}
+    if not os.path.exists(path):
+        return {"teams": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_combine_manifest(manifest, path=COMBINE_MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def combine_teams_incremental(teams, link_texts, manifest, directory=OUTPUT_DIRECTORY):
+    """Rebuild {Team}_Combined.csv only for teams whose category tables changed (or whose file is missing or
+    was modified since); returns {team name: wide DataFrame} for the teams rebuilt."""
+    merge_config = config_hash(MERGE_FILES, "|".join(link_texts))
+    entries = manifest.setdefault("teams", {})
+    rebuilt = {}
+    for team in teams:
+        team_name = team['name']
+        tables = {link_text: file_hash(os.path.join(directory, table_filename(team_name, link_text)))
+                  for link_text in link_texts}
+        combined_path = os.path.join(directory, combined_filename(team_name))
+        entry = entries.get(team_name, {})
+        if (entry.get("tables") == tables and entry.get("merge_config") == merge_config and
+                entry.get("combined") is not None and entry.get("combined") == file_hash(combined_path)):
+            continue
+
+        combined_df = combine_team_tables(load_team_tables(team_name, link_texts, output_directory=directory))
+        if combined_df is None:
+            print(f"No data to combine for team {team_name}.")
+            continue
+        save_team_combined(combined_df, team_name, output_directory=directory)
+        print(f"Combined file saved as {combined_path} with shape {combined_df.shape}")
+        entries[team_name] = dict(entry, tables=tables, merge_config=merge_config, combined=file_hash(combined_path))
+        rebuilt[team_name] = combined_df
+    return rebuilt
+
+
+def derived_path(team_name, derived_directory=DERIVED_DIRECTORY):
+    return os.path.join(derived_directory, f"{team_name.replace(' ', '_')}.pkl")
+
+
+def signature(df):
+    # Column names and dtypes of a team's rows; while they stay the same, so do the stacked table's dtypes
+    return [[column, str(dtype)] for column, dtype in df.dtypes.items()]
+
+
+def splice_rows(stacked_df, previous_teams, derived):
+    """Replace the rows of recomputed teams (DataFrames in `derived`) in the previously stacked table, whose
+    teams and row counts are `previous_teams`; unchanged teams (cache paths in `derived`) keep their rows."""
+    pieces = []
+    start = position = 0
+    for (team_name, rows), frame in zip(previous_teams, derived):
+        if isinstance(frame, pd.DataFrame):
+            if position > start:
+                pieces.append(stacked_df.iloc[start:position])
+            pieces.append(frame)
+            start = position + rows
+        position += rows
+    if position > start:
+        pieces.append(stacked_df.iloc[start:position])
+    return pd.concat(pieces, ignore_index=True)
+
+
+def combine_all_incremental(team_names, manifest, frames=None, directory=OUTPUT_DIRECTORY,
+                            derived_directory=DERIVED_DIRECTORY, output_path=None):
+    """Write All_Teams_Combined.csv, recomputing the derived metrics only for teams whose _Combined.csv
+    changed since the last run.
+
+    The recomputed teams' rows are spliced into the previous table in place of their old rows. If a team's
+    columns or dtypes changed (which can change the whole table's dtypes), the table is restacked from every
+    team's cached frame instead; either way the output is identical to a full rebuild. `frames` may hold
+    wide frames already in memory ({team name: DataFrame}, e.g. from combine_teams_incremental). Returns
+    (DataFrame or None if the output was already current, teams recomputed).
+    """
+    output_path = output_path or os.path.join(directory, "All_Teams_Combined.csv")
+    stacked_path = os.path.join(derived_directory, "All_Teams_Combined.pkl")
+    frames = frames or {}
+    derive_config = config_hash(DERIVE_FILES)
+    entries = manifest.setdefault("teams", {})
+    previous = manifest.get("output", {})
+    os.makedirs(derived_directory, exist_ok=True)
+
+    # Teams in the order CombineAllTeamsData.py reads their _Combined.csv files
+    team_order = sorted((team_name for team_name in team_names
+                         if os.path.exists(os.path.join(directory, combined_filename(team_name)))),
+                        key=lambda team_name: combined_filename(team_name).lower())
+
+    derived = []
+    recomputed = []
+    reshaped = False
+    for team_name in team_order:
+        entry = entries.setdefault(team_name, {})
+        combined_path = os.path.join(directory, combined_filename(team_name))
+        combined = entry.get("combined") if team_name in frames else file_hash(combined_path)
+        cache_path = derived_path(team_name, derived_directory)
+        if (entry.get("derived_from") == combined and entry.get("derived_config") == derive_config and
+                os.path.exists(cache_path)):
+            derived.append(cache_path)
+            continue
+
+        with Telemetry.current().unit(team_name) as unit:
+            if team_name in frames:
+                df = frames[team_name]
+            else:
+                df = pd.read_csv(combined_path)
+                unit.add(bytes=os.path.getsize(combined_path))
+            derived_df = add_derived_metrics(sort_by_date(df))
+            derived_df.to_pickle(cache_path)
+            unit.add(rows=len(derived_df))
+        reshaped = reshaped or entry.get("signature") != signature(derived_df)
+        entry.update(combined=combined, derived_from=combined, derived_config=derive_config,
+                     signature=signature(derived_df), rows=len(derived_df))
+        derived.append(derived_df)
+        recomputed.append(team_name)
+
+    # Nothing to write when the same team rows are already in an unmodified output file
+    output_key = hashlib.sha256(json.dumps([[team_name, entries[team_name]["derived_from"]]
+                                            for team_name in team_order] + [derive_config]).encode("utf-8"))
+    if not recomputed and previous.get("key") == output_key.hexdigest() and \
+            previous.get("hash") == file_hash(output_path):
+        return None, recomputed
+    if not team_order:
+        return None, recomputed
+
+    previous_teams = previous.get("teams", [])
+    stacked_df = None
+    if not reshaped and [team_name for team_name, _ in previous_teams] == team_order and \
+            os.path.exists(stacked_path):
+        stacked_df = pd.read_pickle(stacked_path)
+        if not all(frame.columns.equals(stacked_df.columns) for frame in derived if isinstance(frame, pd.DataFrame)):
+            stacked_df = None
+    if stacked_df is not None:
+        combined_df = splice_rows(stacked_df, previous_teams, derived)
+        combined_df.fillna(0, inplace=True)
+    else:
+        combined_df = combine_all_teams([pd.read_pickle(frame) if isinstance(frame, str) else frame
+                                         for frame in derived])
+
+    combined_df.to_csv(output_path, index=False)
+    combined_df.to_pickle(stacked_path)
+    manifest["output"] = {"key": output_key.hexdigest(), "hash": file_hash(output_path),
+                          "teams": [[team_name, entries[team_name]["rows"]] for team_name in team_order]}
+    return combined_df, recomputed
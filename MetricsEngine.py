@@ -0,0 +1,227 @@
+import argparse
+import ast
+import re
+import numpy as np
+import pandas as pd
+from ResultParsing import WIN_COLUMN, parse_results, parse_top_seconds
+
+# Derived metrics added by CombineAllTeamsData.py, one row per computed column:
+#   Column      name of the new column
+#   Expression  arithmetic (+ - * /, parentheses, numbers) over [Column Name] references and the
+#               functions below; a reference may name another metric
+#   Round       decimal places, empty for none
+#   Placement   AfterResult (inserted after the Result column) or End
+METRIC_DEFINITIONS_PATH = "MetricDefinitions.csv"
+
+REFERENCE_PATTERN = re.compile(r"\[([^\]]+)\]")
+
+
+def win_flags(text, teams):
+    # 1 for a game whose Result is a win, otherwise 0
+    return parse_results(text)[WIN_COLUMN].to_numpy()
+
+
+def top_minutes(text, teams):
+    # Time of possession "mm:ss" as minutes; 0 when the value is missing or not a time
+    return (parse_top_seconds(text) / 60).fillna(0).to_numpy(dtype=float)
+
+
+def cumsum_by_team(values, teams):
+    # Running total within each team, in row order
+    return pd.Series(values).groupby(teams).cumsum().to_numpy()
+
+
+# name: (function, whether its argument is the raw text of a column rather than a number)
+FUNCTIONS = {
+    "win": (win_flags, True),
+    "top_minutes": (top_minutes, True),
+    "cumsum": (cumsum_by_team, False),
+}
+
+OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+}
+
+
+def _divide(numerator, denominator):
+    # Division by zero yields NaN (0 in the combined file after its final fillna), whatever the numerator
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quotient = np.true_divide(numerator, denominator)
+    return np.where(denominator == 0, np.nan, quotient)
+
+
+def compile_expression(expression):
+    """Parse an expression into (tree, references); [Column] references become the names _0, _1, ..."""
+    references = []
+
+    def placeholder(match):
+        if match.group(1) not in references:
+            references.append(match.group(1))
+        return f"_{references.index(match.group(1))}"
+
+    tree = ast.parse(REFERENCE_PATTERN.sub(placeholder, expression), mode="eval")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or len(node.args) != 1 \
+                    or node.keywords:
+                raise ValueError(f"Unsupported function call in metric expression: {expression}")
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in OPERATORS and not isinstance(node.op, ast.Div):
+                raise ValueError(f"Unsupported operator in metric expression: {expression}")
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)):
+                raise ValueError(f"Unsupported constant in metric expression: {expression}")
+        elif isinstance(node, ast.Name):
+            if not (node.id in FUNCTIONS or re.fullmatch(r"_\d+", node.id)):
+                raise ValueError(f"Unknown name {node.id} in metric expression (use [Column Name]): {expression}")
+        elif not isinstance(node, (ast.Expression, ast.UnaryOp, ast.USub, ast.UAdd, ast.Load, ast.operator)):
+            raise ValueError(f"Unsupported syntax in metric expression: {expression}")
+    return tree, references
+
+
+def _text_references(tree, references):
+    # References passed straight to a text function are read as-is instead of being coerced to numbers
+    text = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and FUNCTIONS[node.func.id][1]:
+            argument = node.args[0]
+            if not isinstance(argument, ast.Name) or argument.id in FUNCTIONS:
+                raise ValueError(f"{node.func.id}() takes a single [Column Name]")
+            text.add(references[int(argument.id[1:])])
+    return text
+
+
+def load_metric_definitions(path=METRIC_DEFINITIONS_PATH):
+    definitions_df = pd.read_csv(path, dtype={"Round": "Int64"})
+    definitions = []
+    for row in definitions_df.to_dict(orient="records"):
+        tree, references = compile_expression(row["Expression"])
+        if row["Placement"] not in ("AfterResult", "End"):
+            raise ValueError(f"Metric {row['Column']}: Placement must be AfterResult or End")
+        definitions.append({
+            "column": row["Column"],
+            "expression": row["Expression"],
+            "tree": tree,
+            "references": references,
+            "text_references": _text_references(tree, references),
+            "round": None if pd.isna(row["Round"]) else int(row["Round"]),
+            "placement": row["Placement"],
+        })
+    return definitions
+
+
+def evaluation_order(definitions):
+    # Metrics that reference other metrics are computed after them
+    by_column = {definition["column"]: definition for definition in definitions}
+    order = []
+    state = {}
+
+    def visit(column, path):
+        if state.get(column) == "done":
+            return
+        if state.get(column) == "visiting":
+            raise ValueError(f"Circular metric definitions: {' -> '.join(path + [column])}")
+        state[column] = "visiting"
+        for reference in by_column[column]["references"]:
+            if reference in by_column:
+                visit(reference, path + [column])
+        state[column] = "done"
+        order.append(by_column[column])
+
+    for definition in definitions:
+        visit(definition["column"], [])
+    return order
+
+
+def input_columns(definitions):
+    """Return (numeric, text) frame columns the metrics read, in first-use order."""
+    metric_columns = {definition["column"] for definition in definitions}
+    numeric, text = [], []
+    for definition in definitions:
+        for reference in definition["references"]:
+            if reference in metric_columns:
+                continue
+            target = text if reference in definition["text_references"] else numeric
+            if reference not in target:
+                target.append(reference)
+    both = set(numeric) & set(text)
+    if both:
+        raise ValueError(f"Columns used both as text and as numbers: {sorted(both)}")
+    return numeric, text
+
+
+def _evaluate(node, values, references, teams):
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body, values, references, teams)
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return values[references[int(node.id[1:])]]
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, values, references, teams)
+        return np.negative(operand) if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp):
+        left = _evaluate(node.left, values, references, teams)
+        right = _evaluate(node.right, values, references, teams)
+        if isinstance(node.op, ast.Div):
+            return _divide(left, right)
+        return OPERATORS[type(node.op)](left, right)
+    function = FUNCTIONS[node.func.id][0]
+    return function(_evaluate(node.args[0], values, references, teams), teams)
+
+
+def compute_metrics(df, definitions=None):
+    """Return `df` with every metric column added, computed in one vectorized pass.
+
+    The numeric input columns are coerced once (errors and blanks become 0) and written back, and the
+    new columns are laid out as the published All_Teams_Combined.csv has them: AfterResult metrics
+    follow Result, every metric is appended at the end, and the End metrics are appended once more
+    (the file repeats those columns, and the dashboard reads the first copy).
+    """
+    if definitions is None:
+        definitions = load_metric_definitions()
+    numeric, text = input_columns(definitions)
+    missing = [column for column in numeric + text if column not in df.columns]
+    if missing:
+        raise KeyError(f"Columns needed by the derived metrics are missing: {missing}")
+
+    coerced = {column: pd.to_numeric(df[column], errors='coerce').fillna(0) for column in numeric}
+    values = {column: series.to_numpy() for column, series in coerced.items()}
+    values.update({column: df[column].to_numpy() for column in text})
+    teams = df["TeamNM"].to_numpy()
+
+    for definition in evaluation_order(definitions):
+        result = _evaluate(definition["tree"], values, definition["references"], teams)
+        if definition["round"] is not None:
+            result = np.round(result, definition["round"])
+        values[definition["column"]] = result
+
+    metrics = {definition["column"]: values[definition["column"]] for definition in definitions}
+    df = df.assign(**coerced, **metrics)
+
+    # Insert new columns into their respective positions
+    after_result = [d["column"] for d in definitions if d["placement"] == "AfterResult"]
+    end = [d["column"] for d in definitions if d["placement"] == "End"]
+    result_index = df.columns.get_loc("Result") + 1
+    return pd.concat([
+        df.iloc[:, :result_index],
+        df[after_result],
+        df.iloc[:, result_index:],
+        df[end],
+    ], axis=1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the derived metric definitions.")
+    parser.add_argument("--path", default=METRIC_DEFINITIONS_PATH, help="Metric definitions CSV.")
+    args = parser.parse_args()
+
+    metric_definitions = load_metric_definitions(args.path)
+    numeric_columns, text_columns = input_columns(metric_definitions)
+    print(f"{len(metric_definitions)} metrics, computed in this order:")
+    for metric in evaluation_order(metric_definitions):
+        print(f"  {metric['column']} = {metric['expression']}")
+    print(f"Numeric inputs: {numeric_columns}")
+    print(f"Text inputs: {text_columns}")
@@ -1,5 +1,7 @@
+import os
 import tabula
 import pandas as pd
+import Telemetry
 
 
 def strip_quotes(path):
@@ -21,19 +23,25 @@ def extract_tables_from_pdf():
     excel_output = ensure_xlsx_extension(excel_output)
 
     # Extract tables from the PDF
-    tables = tabula.read_pdf(pdf_path, pages='all', multiple_tables=True)
+    with Telemetry.current().stage("read_pdf") as stage:
+        tables = tabula.read_pdf(pdf_path, pages='all', multiple_tables=True)
+        stage.add(rows=sum(len(table) for table in tables), bytes=os.path.getsize(pdf_path))
 
     # Create a Pandas Excel writer using openpyxl as the engine.
-    with pd.ExcelWriter(excel_output, engine='openpyxl') as writer:
-        for i, table in enumerate(tables):
-            # Convert each table to a DataFrame
-            df = pd.DataFrame(table)
+    with Telemetry.current().stage("write_excel") as stage:
+        with pd.ExcelWriter(excel_output, engine='openpyxl') as writer:
+            for i, table in enumerate(tables):
+                # Convert each table to a DataFrame
+                df = pd.DataFrame(table)
 
-            # Save each table to a separate sheet in the Excel file
-            df.to_excel(writer, sheet_name=f'Table_{i + 1}', index=False)
+                # Save each table to a separate sheet in the Excel file
+                df.to_excel(writer, sheet_name=f'Table_{i + 1}', index=False)
+                stage.add(rows=len(df))
+        stage.add(bytes=os.path.getsize(excel_output))
 
     print(f"Data has been extracted and saved to {excel_output}")
 
 
 if __name__ == "__main__":
-    extract_tables_from_pdf()
+    with Telemetry.run("PDFDataToExcel"):
+        extract_tables_from_pdf()
@@ -0,0 +1,213 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+CACHE_DIRECTORY = "PageCache"
+
+# Changed entries are written to index.json by save(), and also after this many changes so a crash loses few
+FLUSH_EVERY = 200
+
+# A lock file older than this was left by a crashed writer and is taken over
+LOCK_STALE_SECONDS = 60
+
+
+class CacheMiss(Exception):
+    pass
+
+
+class PageCache:
+    """On-disk cache of fetched pages.
+
+    Entries are keyed by URL + team + category and point at content-addressed blobs
+    (objects/<sha256[:2]>/<sha256>.html), so identical pages are stored once. Entries younger than
+    `ttl` seconds are served without a request; older ones are revalidated with ETag/If-Modified-Since.
+    When the blobs exceed `max_bytes` the least recently used entries are evicted. Index changes are kept in
+    memory until save() (or every `flush_every` changes); blobs are written right away.
+
+    Several handles (e.g. process-pool workers) can share a directory: each save merges the index on disk
+    under a lock file and replaces it through its own temporary file.
+    """
+
+    def __init__(self, directory=CACHE_DIRECTORY, ttl=6 * 3600, max_bytes=500 * 1024 * 1024,
+                 flush_every=FLUSH_EVERY):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.removed = set()
+        self.unsaved = 0
+        self.index = self._read_index()
+
+    def settings(self):
+        # Keyword arguments that open another handle on this cache with the same limits (e.g. in a worker)
+        return {"directory": self.directory, "ttl": self.ttl, "max_bytes": self.max_bytes,
+                "flush_every": self.flush_every}
+
+    @staticmethod
+    def key(url, team=None, category=None):
+        return hashlib.sha256(f"{url}|{team}|{category}".encode("utf-8")).hexdigest()
+
+    def blob_path(self, sha256):
+        return os.path.join(self.directory, "objects", sha256[:2], f"{sha256}.html")
+
+    def get(self, url, team=None, category=None):
+        return self.index.get(self.key(url, team, category))
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def read(self, entry):
+        with self.lock:
+            entry["last_access"] = time.time()
+        with open(self.blob_path(entry["sha256"]), encoding="utf-8") as f:
+            return f.read()
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def mark_revalidated(self, entry):
+        # The server answered 304 Not Modified: the stored page is fresh again
+        with self.lock:
+            entry["fetched_at"] = time.time()
+            self.revalidated += 1
+            self._changed()
+
+    def put(self, url, html, team=None, category=None, etag=None, last_modified=None):
+        body = html.encode("utf-8")
+        sha256 = hashlib.sha256(body).hexdigest()
+        blob_path = self.blob_path(sha256)
+
+        with self.lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                with open(blob_path, "wb") as f:
+                    f.write(body)
+
+            key = self.key(url, team, category)
+            previous = self.index.get(key)
+
+            now = time.time()
+            self.index[key] = {
+                "url": url, "team": team, "category": category, "sha256": sha256, "size": len(body),
+                "etag": etag, "last_modified": last_modified, "fetched_at": now, "last_access": now,
+            }
+            if previous is not None and previous["sha256"] != sha256:
+                self._remove_blob_if_unused(previous["sha256"])
+            self._evict()
+            self._changed()
+
+    def lookup(self, url, team=None, category=None, replay=False):
+        """Return (html, entry): html is set when the cache can answer without the network.
+
+        In replay mode a missing entry raises CacheMiss instead of falling through to a request.
+        """
+        entry = self.get(url, team, category)
+        if entry is not None and (replay or self.is_fresh(entry)):
+            self.hits += 1
+            return self.read(entry), entry
+        if replay:
+            raise CacheMiss(f"{url} ({team}, {category}) is not in the page cache")
+        self.misses += 1
+        return None, entry
+
+    def _evict(self):
+        # Drop least recently used entries until the unique blobs fit in max_bytes
+        blob_sizes = {entry["sha256"]: entry["size"] for entry in self.index.values()}
+        total = sum(blob_sizes.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            del self.index[key]
+            self.removed.add(key)
+            if self._remove_blob_if_unused(entry["sha256"]):
+                total -= entry["size"]
+
+    def _remove_blob_if_unused(self, sha256):
+        # Blobs are shared between entries with identical content
+        if any(entry["sha256"] == sha256 for entry in self.index.values()):
+            return False
+        os.remove(self.blob_path(sha256))
+        return True
+
+    def _changed(self):
+        # Called with the lock held; rewriting index.json on every change would make a run quadratic
+        self.unsaved += 1
+        if self.unsaved >= self.flush_every:
+            self._save_index()
+
+    def _read_index(self):
+        # An unreadable index (e.g. cut short by a crash) only loses the entries; the blobs are fetched again
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable page cache index {self.index_path}: {e}")
+            return {}
+
+    @contextlib.contextmanager
+    def _index_lock(self):
+        # Lock file shared by every handle (and process) on the directory; O_EXCL creation works everywhere
+        lock_path = f"{self.index_path}.lock"
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.remove(lock_path)
+
+    def _save_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._index_lock():
+            # Keep entries written by other handles on the same directory (e.g. process-pool workers)
+            for key, entry in self._read_index().items():
+                if key not in self.index and key not in self.removed:
+                    self.index[key] = entry
+
+            descriptor, temp_path = tempfile.mkstemp(prefix="index.", suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                    json.dump(self.index, f)
+                os.replace(temp_path, self.index_path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(temp_path)
+                raise
+        self.unsaved = 0
+
+    def save(self):
+        # Write the entries changed since the last save; the backends call this when they finish
+        with self.lock:
+            if self.unsaved:
+                self._save_index()
+
+    def stats(self):
+        return (f"page cache: {self.hits} hits, {self.misses} requests ({self.revalidated} not modified), "
+                f"{len(self.index)} entries")
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import time
+from ScrapeCommon import OUTPUT_DIRECTORY
+import Telemetry
+
+PIPELINE_STATE_PATH = os.path.join(OUTPUT_DIRECTORY, "pipeline_state.json")
+
+
+class Stage:
+    """One step of the pipeline.
+
+    `run(upstream)` gets {dependency name: output} for the stages listed in `after` and returns this stage's
+    output, which later stages receive in memory. `inputs()` lists the data files the stage reads and
+    `config` the settings/code files it depends on; together with the dependencies' fingerprints they make
+    the stage's fingerprint. When it matches the last successful run and every path in `outputs()` exists,
+    the stage is skipped, and `load()` rebuilds its output from disk only if a later stage needs it.
+    A `volatile` stage (the scrape, whose real input is the website) always runs.
+    """
+
+    def __init__(self, name, run, after=(), inputs=None, config=(), outputs=None, load=None, volatile=False):
+        self.name = name
+        self.run = run
+        self.after = list(after)
+        self.inputs = inputs or (lambda: [])
+        self.config = list(config)
+        self.outputs = outputs or (lambda: [])
+        self.load = load
+        self.volatile = volatile
+
+
+def describe(output):
+    # Short description of a stage output for the report
+    if hasattr(output, "shape"):
+        return f"shape {output.shape}"
+    if isinstance(output, (dict, list)):
+        return f"{len(output)} item(s)"
+    return ""
+
+
+class PipelineRunner:
+    """Runs stages in dependency order in one process, skipping those whose inputs haven't changed.
+
+    The fingerprints of the last successful run of each stage, and the content hashes of the files read
+    (re-hashed only when a file's modification time or size changes), are kept in `state_path`.
+    """
+
+    def __init__(self, stages, state_path=PIPELINE_STATE_PATH):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.state = {"stages": {}, "files": {}}
+        if os.path.exists(state_path):
+            with open(state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def order(self):
+        # Dependencies first, otherwise in the order the stages were given
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Circular stage dependencies: {' -> '.join(path + [name])}")
+            if name not in self.stages:
+                raise ValueError(f"Stage {path[-1]} depends on unknown stage {name}")
+            state[name] = "visiting"
+            for dependency in self.stages[name].after:
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(self.stages[name])
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def file_digest(self, path):
+        stat = os.stat(path)
+        cached = self.state["files"].get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        self.state["files"][path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return digest
+
+    def fingerprint(self, stage, fingerprints):
+        # Sorted paths and content hashes of the inputs and config, plus the dependencies' fingerprints
+        fingerprint = hashlib.sha256(stage.name.encode("utf-8"))
+        for path in sorted(set(stage.inputs()) | set(stage.config)):
+            digest = self.file_digest(path) if os.path.exists(path) else "missing"
+            fingerprint.update(f"{path}\0{digest}\n".encode("utf-8"))
+        for dependency in stage.after:
+            fingerprint.update(f"{dependency}\0{fingerprints[dependency]}\n".encode("utf-8"))
+        return fingerprint.hexdigest()
+
+    def save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        with open(self.state_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+
+    def run(self, force=()):
+        """Run (or skip) every stage; `force` names stages to run regardless ("all" for every stage).
+
+        Returns the report rows: {"stage", "status", "seconds", "detail"}.
+        """
+        fingerprints = {}
+        outputs = {}
+        skipped = set()
+        report = []
+
+        def output_of(name):
+            # Outputs of skipped stages are loaded from disk on first use
+            if name in skipped and name not in outputs:
+                stage = self.stages[name]
+                outputs[name] = stage.load() if stage.load else None
+            return outputs.get(name)
+
+        for stage in self.order():
+            started = time.perf_counter()
+            fingerprint = self.fingerprint(stage, fingerprints)
+            fingerprints[stage.name] = fingerprint
+            current = (not stage.volatile and stage.name not in force and "all" not in force and
+                       self.state["stages"].get(stage.name) == fingerprint and
+                       all(os.path.exists(path) for path in stage.outputs()))
+            if current:
+                skipped.add(stage.name)
+                report.append({"stage": stage.name, "status": "skipped",
+                               "seconds": time.perf_counter() - started, "detail": "inputs unchanged"})
+                print(f"Skipping {stage.name}: inputs unchanged")
+                continue
+
+            print(f"Running {stage.name}...")
+            try:
+                upstream = {dependency: output_of(dependency) for dependency in stage.after}
+                with Telemetry.current().stage(stage.name):
+                    outputs[stage.name] = stage.run(upstream)
+            except BaseException:
+                report.append({"stage": stage.name, "status": "failed",
+                               "seconds": time.perf_counter() - started, "detail": ""})
+                self.save_state()
+                print_report(report)
+                raise
+
+            self.state["stages"][stage.name] = fingerprint
+            self.save_state()
+            report.append({"stage": stage.name, "status": "ran", "seconds": time.perf_counter() - started,
+                           "detail": describe(outputs[stage.name])})
+            print(f"Finished {stage.name}")
+        return report
+
+
+def print_report(report):
+    total = sum(row["seconds"] for row in report)
+    print("\nPipeline report")
+    for row in report:
+        print(f"  {row['stage']:<16} {row['status']:<8} {row['seconds']:>8.2f}s  {row['detail']}")
+    print(f"  {'total':<16} {'':<8} {total:>8.2f}s")
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Typed columns parsed from the raw game text, inserted after Result in All_Teams_Combined
+WIN_COLUMN = "Win"
+POINTS_FOR_COLUMN = "Points For"
+POINTS_AGAINST_COLUMN = "Points Against"
+OVERTIME_COLUMN = "OT Periods"
+TOP_SECONDS_COLUMN = "TOP Seconds"
+PARSED_COLUMNS = [WIN_COLUMN, POINTS_FOR_COLUMN, POINTS_AGAINST_COLUMN, OVERTIME_COLUMN, TOP_SECONDS_COLUMN]
+
+# "W 38-3", "L 24-31 (1 OT)", "L 41-43 (3 OT)"
+RESULT_PATTERN = (r"^\s*(?P<outcome>[WLT])\s*(?P<points_for>\d+)\s*-\s*(?P<points_against>\d+)"
+                  r"\s*(?:\((?P<ot>\d+)\s*OT\))?")
+# "24:57" (minutes:seconds of possession)
+TOP_PATTERN = r"^\s*(?P<minutes>\d+):(?P<seconds>\d{1,2})\s*$"
+
+
+def _parse_distinct(values, parse):
+    # Game text repeats heavily (a few hundred distinct scores and times per season), so parse the
+    # distinct values only and expand the typed result back to every row with the factorize codes
+    values = pd.Series(values, dtype=object)
+    codes, uniques = pd.factorize(values)
+    parsed = parse(pd.Series(np.append(uniques, None), dtype=object))  # Last row: missing values
+    return parsed.take(np.where(codes < 0, len(uniques), codes)).set_axis(values.index)
+
+
+def _parse_results_text(results):
+    parts = results.str.extract(RESULT_PATTERN)
+    return pd.DataFrame({
+        WIN_COLUMN: (parts["outcome"] == "W").astype(np.int64),
+        POINTS_FOR_COLUMN: pd.to_numeric(parts["points_for"]).astype("Int64"),
+        POINTS_AGAINST_COLUMN: pd.to_numeric(parts["points_against"]).astype("Int64"),
+        OVERTIME_COLUMN: pd.to_numeric(parts["ot"]).astype("Int64").fillna(0).where(parts["outcome"].notna()),
+    })
+
+
+def _parse_top_text(top):
+    parts = top.str.extract(TOP_PATTERN)
+    return (pd.to_numeric(parts["minutes"]) * 60 + pd.to_numeric(parts["seconds"])).astype("Int64")
+
+
+def parse_results(results):
+    """Parse Result strings into win flag, points for/against and overtime periods.
+
+    Returns a DataFrame on the same index; scores are nullable integers, missing when the text is not a
+    final score, and OT Periods is 0 for games decided in regulation.
+    """
+    return _parse_distinct(results, _parse_results_text)
+
+
+def parse_top_seconds(top):
+    # "mm:ss" time of possession as whole seconds; missing when the value is not a time
+    return _parse_distinct(top, _parse_top_text)
+
+
+def add_parsed_columns(df, result_column="Result", top_column="Total Offense_TOP"):
+    """Return `df` with the parsed columns inserted right after `result_column`."""
+    parsed = parse_results(df[result_column])
+    if top_column in df.columns:
+        parsed[TOP_SECONDS_COLUMN] = parse_top_seconds(df[top_column])
+    else:
+        parsed[TOP_SECONDS_COLUMN] = pd.array([pd.NA] * len(df), dtype="Int64")
+
+    result_index = df.columns.get_loc(result_column) + 1
+    return pd.concat([
+        df.iloc[:, :result_index],
+        parsed,
+        df.iloc[:, result_index:].drop(columns=PARSED_COLUMNS, errors="ignore"),
+    ], axis=1)
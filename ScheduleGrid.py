@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+
+def build_schedule_grid(schedule_df, colors_df, selected_teams):
+    """Week-by-team grid of schedule cells: "8/31/2024 (Sat) @Utah", a colored <div> for home games, or "bye".
+
+    `schedule_df` needs Week, HomeTeam, AwayTeam, 'Start Date' (datetime) and Day (e.g. "Sat") columns; a
+    team with several games in a week shows the first one in file order. The schedule is reshaped into
+    (team, week) rows once, so the cost no longer grows with the number of cells.
+    """
+    selected_teams = list(selected_teams)
+    all_weeks = list(range(1, schedule_df['Week'].max() + 1))
+
+    # One row per (game, selected team) for the team's side of each game, in file order
+    games = schedule_df.reset_index(drop=True)
+    sides = pd.concat([
+        games[games['HomeTeam'].isin(selected_teams)].assign(Team=lambda df: df['HomeTeam']),
+        games[games['AwayTeam'].isin(selected_teams)].assign(Team=lambda df: df['AwayTeam']),
+    ])
+    sides = sides.rename_axis('Row').sort_values(['Row'], kind='stable').reset_index()
+    sides = sides.drop_duplicates(['Team', 'Week'], keep='first')
+
+    # Opponent ("@" for away games), date without leading zeros plus the day, and home-game highlight
+    is_away = sides['AwayTeam'] == sides['Team']
+    opponent = sides['AwayTeam'].where(~is_away, '@' + sides['HomeTeam'])
+    formatted_date = sides['Start Date'].dt.strftime('%m/%d/%Y').str.lstrip('0').str.replace('/0', '/', regex=False)
+    text = formatted_date + ' (' + sides['Day'] + ') ' + opponent
+
+    team_colors = colors_df.drop_duplicates('Team').set_index('Team')['Color']
+    color = sides['Team'].map(team_colors).fillna('')
+    is_home = sides['HomeTeam'] == sides['Team']
+    home_cell = "<div style='background-color:" + color + ";color:white;padding:5px;border-radius:5px;'>" + text + \
+        "</div>"
+    sides['Cell'] = text.where(~is_home, home_cell)
+
+    # Pivot into weeks x teams (selection order), with "bye" for weeks without a game
+    grid_df = (sides.pivot(index='Week', columns='Team', values='Cell')
+               .reindex(index=all_weeks, columns=selected_teams)
+               .fillna('bye')
+               .astype(object))
+    grid_df.columns.name = None
+    return grid_df.rename_axis('Week').reset_index()
+
+
+def schedule_html(grid_df):
+    # The schedule table as rendered on the "Team Schedules" page
+    return grid_df.to_html(index=False, escape=False, classes='schedule-table')
+
+
+class ScheduleHtmlCache:
+    """Bounded LRU of rendered schedule tables.
+
+    Keys are (schedule file hash, team selection, colors file hash). The selection is kept in the order the
+    teams were picked, because the grid's columns follow that order.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, schedule_hash, selected_teams, colors_hash, build):
+        # `build` returns the HTML on a miss; it runs outside the lock so one slow render doesn't block others
+        key = (schedule_hash, tuple(selected_teams), colors_hash)
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        html = build()
+        with self.lock:
+            self.entries[key] = html
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return html
+
+    def stats(self):
+        return f"schedule HTML cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} entries"
@@ -0,0 +1,74 @@
+import os
+import pandas as pd
+from TableExtract import extract_table
+
+# Directory where the per-team category tables are saved
+OUTPUT_DIRECTORY = os.path.join(".", "TeamDataFiles")
+
+# Columns that are shared by every category table and are not prefixed with the link text
+DIMENSION_COLUMNS = ["TeamNM", "Date", "Opponent", "Result"]
+
+
+def load_active_link_texts(path='link_texts.csv'):
+    # Load the link texts from the CSV file and filter for active links
+    link_texts_df = pd.read_csv(path)
+    return link_texts_df[link_texts_df['active'] == 1]['link_text'].tolist()
+
+
+def load_active_teams(path='teams.csv'):
+    # Load the teams from the CSV file and filter for active teams
+    teams_df = pd.read_csv(path)
+    return teams_df[teams_df['active'] == 1].to_dict(orient='records')
+
+
+def table_filename(team_name, link_text):
+    # File named by team name, link text, and table number
+    return f"{team_name.replace(' ', '_')}_{link_text.replace(' ', '_')}_Table_4.csv"
+
+
+def combined_filename(team_name):
+    return f"{team_name.replace(' ', '_')}_Combined.csv"
+
+
+def new_summary(team_name, worker):
+    # Per-team result shared by every scraper backend and merged into the final report
+    return {"team": team_name, "worker": worker, "saved": 0, "empty": 0, "errors": [],
+            "skipped": False, "games": None, "tables": {}, "seconds": 0.0}
+
+
+def parse_table_4(html, team_name, link_text):
+    """Extract the game-by-game table (the fourth table on the page) as a DataFrame.
+
+    Returns None when the page has fewer than four tables or the table has no data rows.
+    """
+    extracted = extract_table(html, index=3)  # Index 3 corresponds to the fourth table (0-based index)
+    if extracted is None:
+        return None
+
+    headers, columns = extracted
+    if not columns or not columns[0]:
+        return None
+
+    df = pd.DataFrame(dict(enumerate(columns)))
+    df.columns = headers
+
+    # Remove rows where the first column (Date) is "Totals" or "Defensive Totals"
+    df = df[~df.iloc[:, 0].isin(["Totals", "Defensive Totals"])]
+
+    # Insert the team name at the beginning of the DataFrame
+    df.insert(0, "TeamNM", team_name)
+
+    # Append the link_text to the column names except for TeamNM, Date, Opponent, and Result
+    df.columns = [
+        col if col in DIMENSION_COLUMNS else f"{link_text}_{col}"
+        for col in df.columns
+    ]
+    return df
+
+
+def save_team_table(df, team_name, link_text, output_directory=OUTPUT_DIRECTORY):
+    # Save the DataFrame to a CSV file and return its path
+    os.makedirs(output_directory, exist_ok=True)
+    csv_filepath = os.path.join(output_directory, table_filename(team_name, link_text))
+    df.to_csv(csv_filepath, index=False)
+    return csv_filepath
@@ -2,29 +2,39 @@ import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.edge.options import Options
-from bs4 import BeautifulSoup
 import os
+from PageCache import PageCache
+from TableExtract import extract_all_tables
 
 # Define the URL to inspect
 url_to_inspect = "https://stats.ncaa.org/players/8105308?year_stat_category_id=15057"
 
-# Set up Edge WebDriver
-edge_options = Options()
-edge_options.use_chromium = True  # Ensure Chromium is used
-edge_driver_path = "C:/Users/mhump/Downloads/edgedriver_win64/msedgedriver.exe"  # Adjust this path as needed
+# Read the page through the local cache, only starting a browser when it is missing or stale
+cache = PageCache()
+html, _ = cache.lookup(url_to_inspect)
 
-service = EdgeService(executable_path=edge_driver_path)
-driver = webdriver.Edge(service=service, options=edge_options)
+if html is None:
+    # Set up Edge WebDriver
+    edge_options = Options()
+    edge_options.use_chromium = True  # Ensure Chromium is used
+    edge_driver_path = "C:/Users/mhump/Downloads/edgedriver_win64/msedgedriver.exe"  # Adjust this path as needed
 
-# Load the URL
-driver.get(url_to_inspect)
+    service = EdgeService(executable_path=edge_driver_path)
+    driver = webdriver.Edge(service=service, options=edge_options)
 
-# Get the page source and parse it with BeautifulSoup
-html = driver.page_source
-soup = BeautifulSoup(html, "html.parser")
+    # Load the URL and keep the rendered page source
+    driver.get(url_to_inspect)
+    html = driver.page_source
+    cache.put(url_to_inspect, html)
+    cache.save()
 
-# Find all tables in the page
-tables = soup.find_all("table")
+    # Close the WebDriver
+    driver.quit()
+else:
+    print(f"Loaded {url_to_inspect} from the page cache.")
+
+# Extract every table from the page
+tables = extract_all_tables(html)
 
 # Output: Number of tables found
 print(f"Found {len(tables)} tables on the page.")
@@ -34,18 +44,7 @@ output_directory = os.path.join(".", "TableExports")
 os.makedirs(output_directory, exist_ok=True)
 
 # Loop through each table, convert it to a DataFrame, and save it to a CSV file
-for i, table in enumerate(tables):
-    # Get headers and rows
-    headers = [header.text.strip() for header in table.find_all('th')]
-    rows = table.find_all('tr')
-
-    data = []
-    for row in rows:
-        columns = row.find_all('td')
-        row_data = [column.text.strip() for column in columns]
-        if row_data:  # Only add rows with data
-            data.append(row_data)
-
+for i, (headers, data) in enumerate(tables):
     # Create a DataFrame
     df = pd.DataFrame(data, columns=headers if headers else None)
 
@@ -55,6 +54,3 @@ for i, table in enumerate(tables):
 
     # Output: Confirm the file was saved
     print(f"Table {i + 1} saved as {csv_filename}")
-
-# Close the WebDriver
-driver.quit()
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from ScrapeCommon import OUTPUT_DIRECTORY, load_active_link_texts, load_active_teams, new_summary
+
+JOURNAL_PATH = os.path.join(OUTPUT_DIRECTORY, "scrape_journal.jsonl")
+
+# Retry rounds for (team, category) units that failed during a run, and the wait before the first one
+# (doubled for each later round); units still failing after the last round are dead-lettered
+MAX_RETRIES = 3
+RETRY_BACKOFF = 30.0
+
+# Serializes appends from the threads of one process (other processes append whole lines on their own)
+_append_lock = threading.Lock()
+
+
+class ScrapeJournal:
+    """Checkpoint journal of one scrape session's (team, category) units.
+
+    Each outcome is appended as one JSON line as soon as it is known, so after a crash or a hung driver the
+    journal still tells which units were stored. The latest line for a unit is its state: "done" (stored,
+    empty, or the team was skipped as current), "failed" (retried later in the run) or "dead" (still failing
+    after the retries). Team lines hold the game count read from the team page.
+
+    A plain run starts a new session; --resume and --only-failed continue the last one. Lines are written by
+    opening the file in append mode, so process-pool workers can write to the same journal.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.reload()
+
+    def reload(self):
+        # Rebuild the unit states from the file (e.g. after workers in other processes wrote to it)
+        self.session = None
+        self.units = {}
+        self.games = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                # A line cut short by a crash is ignored; its unit is simply not done
+                try:
+                    self._apply(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+    def _apply(self, entry):
+        if "session" in entry:
+            self.session = entry
+        elif entry.get("category") is None:
+            self.games[entry["team"]] = entry.get("games")
+        else:
+            self.units[(entry["team"], entry["category"])] = entry
+
+    def _append(self, entry):
+        entry["time"] = datetime.now().isoformat(timespec="seconds")
+        with _append_lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._apply(entry)
+
+    def start_session(self, argv=()):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with _append_lock:
+            open(self.path, "w", encoding="utf-8").close()
+        self.reload()
+        self._append({"session": datetime.now().isoformat(timespec="seconds"), "argv": list(argv)})
+
+    def team_page(self, team_name, games):
+        self._append({"team": team_name, "category": None, "games": games})
+
+    def done(self, team_name, link_text, table=None):
+        # `table` is the write_table() manifest entry, None for an empty table or a skipped team
+        self._append({"team": team_name, "category": link_text, "status": "done", "table": table})
+
+    def skipped(self, team_name, link_texts):
+        for link_text in link_texts:
+            self.done(team_name, link_text)
+
+    def failed(self, team_name, link_text, error):
+        self._append({"team": team_name, "category": link_text, "status": "failed", "error": str(error)})
+
+    def dead(self, team_name, link_text, attempts):
+        error = self.units.get((team_name, link_text), {}).get("error")
+        self._append({"team": team_name, "category": link_text, "status": "dead", "attempts": attempts,
+                      "error": error})
+
+    def units_with(self, statuses, teams, link_texts):
+        """{team: [link texts, in link order]} of the active units whose latest state is one of `statuses`."""
+        units = {}
+        for team in teams:
+            found = [link_text for link_text in link_texts
+                     if self.units.get((team['name'], link_text), {}).get("status") in statuses]
+            if found:
+                units[team['name']] = found
+        return units
+
+    def remaining(self, teams, link_texts):
+        """{team: [link texts]} of the active units not done in this session (failed, dead or never reached)."""
+        return self.units_with(("failed", "dead", None), teams, link_texts)
+
+    def summaries(self):
+        """Per-team summaries (ScrapeCommon.new_summary shape) of everything recorded this session, for
+        ScrapeManifest.update_manifest: stored tables, the units not done as errors, and the game count."""
+        summaries = {}
+        for (team_name, link_text), entry in self.units.items():
+            summary = summaries.setdefault(team_name, new_summary(team_name, "journal"))
+            if entry["status"] != "done":
+                summary["errors"].append(link_text)
+            elif entry.get("table") is not None:
+                summary["tables"][link_text] = entry["table"]
+        for team_name, summary in summaries.items():
+            summary["games"] = self.games.get(team_name)
+        return list(summaries.values())
+
+    def counts(self):
+        counts = {"done": 0, "failed": 0, "dead": 0}
+        for entry in self.units.values():
+            counts[entry["status"]] += 1
+        return counts
+
+
+def print_journal(journal):
+    counts = journal.counts()
+    print(f"Checkpoint {journal.path}: {counts['done']} done, {counts['failed']} failed, "
+          f"{counts['dead']} dead-lettered")
+    for (team_name, link_text), entry in sorted(journal.units.items()):
+        if entry["status"] == "dead":
+            print(f"  dead: {team_name:<16} {link_text:<24} after {entry['attempts']} attempt(s): {entry['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the state of the last scrape session's checkpoint journal.")
+    parser.add_argument("--journal", default=JOURNAL_PATH)
+    args = parser.parse_args()
+
+    scrape_journal = ScrapeJournal(args.journal)
+    if scrape_journal.session is None:
+        print(f"No scrape session recorded in {args.journal}")
+    else:
+        print(f"Session started {scrape_journal.session['session']}")
+        print_journal(scrape_journal)
+        remaining = scrape_journal.remaining(load_active_teams(), load_active_link_texts())
+        print(f"{sum(len(link_texts) for link_texts in remaining.values())} active unit(s) not done "
+              f"(ScrapeNCAA.py --resume fetches them)")
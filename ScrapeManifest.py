@@ -0,0 +1,119 @@
+import json
+import os
+from datetime import datetime
+import pandas as pd
+from ScrapeCommon import OUTPUT_DIRECTORY, save_team_table, table_filename
+from TableExtract import extract_table
+import TableStore
+
+MANIFEST_PATH = os.path.join(OUTPUT_DIRECTORY, "scrape_manifest.json")
+
+
+def load_manifest(path=MANIFEST_PATH):
+    # {"teams": {team: {"games", "last_scrape", "categories": {link_text: {"rows", "latest_date", "last_scrape"}}}}}
+    if not os.path.exists(path):
+        return {"teams": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def count_games(html):
+    """Count the game rows in the team page's game-by-game table, or None if the page has no such table."""
+    extracted = extract_table(html, index=3)
+    if extracted is None or not extracted[1]:
+        return None
+    dates = extracted[1][0]
+    return sum(1 for value in dates if value not in ("Totals", "Defensive Totals"))
+
+
+def is_team_current(manifest, team_name, game_count, link_texts):
+    # Upstream has no new games and every active category was stored on a previous run
+    entry = manifest["teams"].get(team_name)
+    if entry is None or game_count is None or entry.get("games") != game_count:
+        return False
+    return all(link_text in entry.get("categories", {}) for link_text in link_texts)
+
+
+def parse_dates(dates):
+    return pd.to_datetime(dates, format="%m/%d/%Y", errors="coerce")
+
+
+def write_table(df, team_name, link_text, incremental=False, fmt="csv", output_directory=OUTPUT_DIRECTORY):
+    """Save a scraped category table, appending only games newer than the stored file in incremental mode.
+
+    `fmt` selects the TeamDataFiles/ CSV or the TableStore/ columnar store.
+    Returns the manifest entry for the category: total rows on disk, rows written and latest game date.
+    """
+    if fmt == "parquet":
+        return _write_store_table(df, team_name, link_text, incremental)
+
+    filepath = os.path.join(output_directory, table_filename(team_name, link_text))
+    new_rows = len(df)
+
+    if incremental and os.path.exists(filepath):
+        stored = pd.read_csv(filepath, dtype=str, keep_default_na=False)
+        if list(stored.columns) == list(df.columns):
+            # Only games after the latest Date already on disk are appended
+            latest_stored = parse_dates(stored["Date"]).max()
+            if pd.notna(latest_stored):
+                df = df[parse_dates(df["Date"]) > latest_stored]
+            new_rows = len(df)
+            if new_rows:
+                df.to_csv(filepath, mode="a", header=False, index=False)
+            df = pd.concat([stored, df], ignore_index=True)
+        else:
+            # The upstream columns changed, so the stored file cannot be extended
+            save_team_table(df, team_name, link_text, output_directory)
+    else:
+        save_team_table(df, team_name, link_text, output_directory)
+
+    latest_date = parse_dates(df["Date"]).max()
+    return {
+        "rows": len(df),
+        "new_rows": new_rows,
+        "latest_date": latest_date.strftime("%m/%d/%Y") if pd.notna(latest_date) else None,
+    }
+
+
+def _write_store_table(df, team_name, link_text, incremental):
+    typed = TableStore.type_table(df)
+    new_rows = len(typed)
+
+    stored = TableStore.read_category_table(team_name, link_text) if incremental else None
+    if stored is not None and list(stored.columns) == list(typed.columns):
+        # Only games after the latest Date already in the store are added
+        typed = typed[typed["Date"] > stored["Date"].max()]
+        new_rows = len(typed)
+        typed = pd.concat([stored, typed], ignore_index=True)
+
+    if new_rows or stored is None:
+        TableStore.write_category_table(typed, team_name, link_text)
+
+    latest_date = typed["Date"].max()
+    return {
+        "rows": len(typed),
+        "new_rows": new_rows,
+        "latest_date": latest_date.strftime("%m/%d/%Y") if pd.notna(latest_date) else None,
+    }
+
+
+def update_manifest(manifest, summaries):
+    # Record the games and per-category row counts reported by the scrape summaries
+    now = datetime.now().isoformat(timespec="seconds")
+    for summary in summaries:
+        entry = manifest["teams"].setdefault(summary["team"], {"categories": {}})
+        # A team's game count is only trusted once every category has been stored without errors
+        if summary.get("games") is not None and not summary["errors"]:
+            entry["games"] = summary["games"]
+        entry["last_scrape"] = now
+        for link_text, table in summary.get("tables", {}).items():
+            entry["categories"][link_text] = {
+                "rows": table["rows"], "latest_date": table["latest_date"], "last_scrape": now,
+            }
+    return manifest
@@ -1,136 +1,358 @@
-import os
-import pandas as pd
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.edge.service import Service as EdgeService
 from selenium.webdriver.edge.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import time
+from ScrapeCommon import load_active_link_texts, load_active_teams, new_summary, parse_table_4
+from PageCache import CACHE_DIRECTORY, PageCache
+import Telemetry
+from ScrapeJournal import MAX_RETRIES, RETRY_BACKOFF, ScrapeJournal, print_journal
+from ScrapeManifest import count_games, is_team_current, load_manifest, save_manifest, update_manifest, write_table
+
+EDGE_DRIVER_PATH = "C:/Users/mhump/Downloads/edgedriver_win64/msedgedriver.exe"
 
-# Step 1: Load the link texts from the CSV file and filter for active links
-link_texts_df = pd.read_csv('link_texts.csv')
-link_texts = link_texts_df[link_texts_df['active'] == 1]['link_text'].tolist()
 
-# Step 2: Load the teams from the CSV file and filter for active teams
-teams_df = pd.read_csv('teams.csv')
-teams = teams_df[teams_df['active'] == 1].to_dict(orient='records')
+def create_driver():
+    # Set up Edge WebDriver
+    edge_options = Options()
+    edge_options.use_chromium = True  # Ensure Chromium is used
 
-# Step 3: Set up Edge WebDriver
-edge_options = Options()
-edge_options.use_chromium = True  # Ensure Chromium is used
-edge_driver_path = "C:/Users/mhump/Downloads/edgedriver_win64/msedgedriver.exe"
+    service = EdgeService(executable_path=EDGE_DRIVER_PATH)
+    return webdriver.Edge(service=service, options=edge_options)
 
-service = EdgeService(executable_path=edge_driver_path)
-driver = webdriver.Edge(service=service, options=edge_options)
 
-# Output: Confirm WebDriver setup
-print("Edge WebDriver setup completed.")
+def scrape_team(driver, team, link_texts, log=print, manifest=None, incremental=False, worker=1, cache=None,
+                fmt="csv", journal=None):
+    """Click through every category link for one team and save each Table 4 as a CSV.
 
-# Step 4: Set up the output directory
-output_directory = os.path.join(".", "TeamDataFiles")
-os.makedirs(output_directory, exist_ok=True)
+    In incremental mode the team is skipped when its game count matches the manifest, and only
+    new games are appended to the stored CSVs. Rendered pages are written to `cache` when given,
+    so they can be re-parsed later with --replay. Each category's outcome is checkpointed in `journal`
+    (a ScrapeJournal) when given. Returns a summary dict (see ScrapeCommon.new_summary).
+    """
+    summary = new_summary(team['name'], worker)
 
-# Step 5: Loop through each active team
-for team in teams:
     # Construct the team-specific URL
     url = f"https://stats.ncaa.org/players/{team['id']}"
-    driver.get(url)
+    with Telemetry.current().unit(team['name']) as unit:
+        driver.get(url)
+        unit.add(requests=1)
+        log(f"Navigated to {url} for team {team['name']}.")
+
+        try:
+            WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.LINK_TEXT, link_texts[0])))
+            html = driver.page_source
+            unit.add(bytes=len(html.encode("utf-8")))
+            summary["games"] = count_games(html)
+            if cache is not None:
+                cache.put(url, html, team['name'])
+            if journal is not None:
+                journal.team_page(team['name'], summary["games"])
+        except Exception as e:
+            unit.set(status="failed")
+            log(f"Could not count games for team {team['name']}: {e}")
 
-    # Output: Confirm navigation
-    print(f"Navigated to {url} for team {team['name']}.")
+    if incremental and is_team_current(manifest, team['name'], summary["games"], link_texts):
+        log(f"No new games for team {team['name']}, skipping.")
+        summary["skipped"] = True
+        if journal is not None:
+            journal.skipped(team['name'], link_texts)
+        return summary
 
-    # Step 6: Loop through each active link text, click, and extract Table 4
+    # Loop through each active link text, click, and extract Table 4
     for link_text in link_texts:
         try:
-            # Wait until the link is clickable and click it
-            navigation_link = WebDriverWait(driver, 15).until(
-                EC.element_to_be_clickable((By.LINK_TEXT, link_text))
-            )
-            navigation_link.click()
-            print(f"Clicked on the link: {link_text}")
-
-            # Wait for the new page to load
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.TAG_NAME, "table"))
-            )
-            print(f"New page loaded for: {link_text}")
-
-            # Get the new page source
-            new_html = driver.page_source
-            new_soup = BeautifulSoup(new_html, "html.parser")
-
-            # Find the fourth table and extract the data
-            new_tables = new_soup.find_all("table")
-
-            if len(new_tables) >= 4:
-                table = new_tables[3]  # Index 3 corresponds to the fourth table (0-based index)
-
-                headers = [header.text.strip() for header in table.find_all('th')]
-                rows = table.find_all('tr')
-
-                data = []
-                for row in rows:
-                    columns = row.find_all('td')
-
-                    # Extract row data
-                    row_data = [column.text.strip() for column in columns]
-                    if row_data:  # Ensure the row has data
-                        data.append(row_data)
-                        # Print row data for debugging
-                        print(f"Row data: {row_data}")
-
-                # Create a DataFrame from the extracted data
-                if data:
-                    df = pd.DataFrame(data, columns=headers)
-
-                    # Remove rows where the first column (Date) is "Totals" or "Defensive Totals"
-                    df = df[~df.iloc[:, 0].isin(["Totals", "Defensive Totals"])]
-
-                    # Insert the team name at the beginning of the DataFrame
-                    df.insert(0, "TeamNM", team['name'])
-
-                    # Append the link_text to the column names except for TeamNM, Date, Opponent, and Result
-                    df.columns = [
-                        col if col in ["TeamNM", "Date", "Opponent", "Result"] else f"{link_text}_{col}"
-                        for col in df.columns
-                    ]
-
-                else:
-                    print(f"{link_text} Table 4 has no data.")
-                    continue
+            with Telemetry.current().unit(team['name'], link_text) as unit:
+                # Wait until the link is clickable and click it
+                navigation_link = WebDriverWait(driver, 15).until(
+                    EC.element_to_be_clickable((By.LINK_TEXT, link_text))
+                )
+                navigation_link.click()
+                unit.add(requests=1)
 
-                # Output: Show the DataFrame shape and the first few rows
-                print(f"DataFrame shape: {df.shape}")
-                print(df.head())
+                # Wait for the new page to load
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "table"))
+                )
 
-                # Save the DataFrame to a CSV file named by team name, link text, and table number
-                csv_filename = f"{team['name'].replace(' ', '_')}_{link_text.replace(' ', '_')}_Table_4.csv"
-                csv_filepath = os.path.join(output_directory, csv_filename)
-                df.to_csv(csv_filepath, index=False)
+                html = driver.page_source
+                unit.add(bytes=len(html.encode("utf-8")))
+                if cache is not None:
+                    cache.put(driver.current_url, html, team['name'], link_text)
 
-                # Output: Confirm that CSV was saved
-                print(f"Table 4 saved as {csv_filepath} for team {team['name']} and link {link_text}.")
-            else:
-                print(f"Less than 4 tables found on the page for {link_text}.")
+                df = parse_table_4(html, team['name'], link_text)
+                if df is None:
+                    unit.set(status="empty")
+                    summary["empty"] += 1
+                    table = None
+                else:
+                    unit.add(rows=len(df))
+                    table = write_table(df, team['name'], link_text, incremental=incremental, fmt=fmt)
+                    summary["tables"][link_text] = table
+                    summary["saved"] += 1
+                if journal is not None:
+                    journal.done(team['name'], link_text, table)
 
-            # Optional: Adding a short delay before moving to the next link
-            time.sleep(1)
+                # Optional: Adding a short delay before moving to the next link
+                time.sleep(1)
 
-            # Navigate back to the original page to click the next link
-            driver.back()
-            WebDriverWait(driver, 15).until(
-                EC.presence_of_element_located((By.LINK_TEXT, link_texts[0]))
-            )
-            print(f"Navigated back to the main page for team {team['name']}.")
+                # Navigate back to the original page to click the next link
+                driver.back()
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.LINK_TEXT, link_texts[0]))
+                )
 
         except Exception as e:
-            print(f"Error processing {link_text} for team {team['name']}: {e}")
+            log(f"Error processing {link_text} for team {team['name']}: {e}")
             driver.save_screenshot(f"{team['name']}_{link_text}_error.png")
+            summary["errors"].append(link_text)
+            if journal is not None:
+                journal.failed(team['name'], link_text, e)
+
+    return summary
+
+
+def run_worker(worker_id, teams, link_texts, manifest=None, incremental=False, cache_settings=None, fmt="csv",
+               journal=None):
+    # Each worker owns an independent browser session for its shard of teams
+    def log(message):
+        print(f"[worker {worker_id}] {message}", flush=True)
+
+    # Each worker opens its own handle on the cache so it also works in a process pool
+    cache = PageCache(**cache_settings) if cache_settings else None
+    driver = create_driver()
+    log(f"Edge WebDriver setup completed, {len(teams)} team(s) assigned.")
+
+    summaries = []
+    try:
+        for position, team in enumerate(teams, start=1):
+            started = time.perf_counter()
+            try:
+                summary = scrape_team(driver, team, link_texts, log=log, manifest=manifest,
+                                      incremental=incremental, worker=worker_id, cache=cache, fmt=fmt,
+                                      journal=journal)
+            except Exception as e:
+                # The team page itself failed (e.g. the driver hung); its categories go to the retry queue
+                log(f"Error loading team page for {team['name']}: {e}")
+                summary = new_summary(team['name'], worker_id)
+                summary["errors"].extend(link_texts)
+                if journal is not None:
+                    for link_text in link_texts:
+                        journal.failed(team['name'], link_text, e)
+            summary["seconds"] = round(time.perf_counter() - started, 1)
+            summaries.append(summary)
+            log(f"({position}/{len(teams)}) {team['name']} done in {summary['seconds']}s: "
+                f"{summary['saved']} saved, {summary['empty']} empty, {len(summary['errors'])} errors.")
+    finally:
+        driver.quit()
+        log("Edge WebDriver closed.")
+        if cache is not None:
+            # The tables are already stored; a failed index write only costs this worker's cache entries
+            try:
+                cache.save()
+            except OSError as e:
+                log(f"Could not save the page cache index: {e}")
+
+    return summaries
+
+
+def shard_teams(teams, workers):
+    # Deal teams round-robin so each worker gets a similar number of teams
+    return [shard for shard in (teams[i::workers] for i in range(workers)) if shard]
+
+
+def scrape_teams(teams, link_texts, workers=1, pool="thread", manifest=None, incremental=False,
+                 cache_settings=None, fmt="csv", journal=None):
+    shards = shard_teams(teams, max(1, workers))
+    executor_class = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+
+    summaries = []
+    with executor_class(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(run_worker, worker_id, shard, link_texts, manifest, incremental, cache_settings, fmt,
+                            journal)
+            for worker_id, shard in enumerate(shards, start=1)
+        ]
+        for future in futures:
+            summaries.extend(future.result())
+
+    return summaries
+
+
+def scrape_with_backend(args, teams, link_texts, manifest, cache, journal):
+    if args.backend == "http":
+        # Imported here so the Selenium-only setup does not need requests/aiohttp installed
+        from HttpScrape import scrape_teams_http
+        return scrape_teams_http(teams, link_texts, base_url=args.base_url,
+                                 concurrency=args.concurrency, save_html_dir=args.save_html,
+                                 manifest=manifest, incremental=args.incremental,
+                                 cache=cache, replay=args.replay, fmt=args.format, journal=journal)
+    if args.backend == "async":
+        import asyncio
+        from AsyncScrape import scrape_teams_async
+        return asyncio.run(scrape_teams_async(
+            teams, link_texts, base_url=args.base_url, concurrency=args.concurrency, rate=args.rate,
+            burst=args.burst, timeout=args.timeout, save_html_dir=args.save_html,
+            manifest=manifest, incremental=args.incremental, cache=cache, replay=args.replay, fmt=args.format,
+            journal=journal,
+        ))
+    return scrape_teams(teams, link_texts, workers=args.workers, pool=args.pool,
+                        manifest=manifest, incremental=args.incremental,
+                        cache_settings=cache.settings() if cache else None, fmt=args.format, journal=journal)
+
+
+def scrape_units(args, teams, units, manifest, cache, journal):
+    # Scrape the (team, category) units in `units` ({team name: [link texts]}); teams with the same
+    # categories left to fetch go to the backend together
+    groups = {}
+    for team in teams:
+        if units.get(team['name']):
+            groups.setdefault(tuple(units[team['name']]), []).append(team)
+
+    summaries = []
+    for link_texts, group in groups.items():
+        summaries += scrape_with_backend(args, group, list(link_texts), manifest, cache, journal)
+    return summaries
+
+
+def print_summary(summaries, elapsed):
+    # Merged summary across all workers
+    print(f"\nScraped {len(summaries)} team(s) in {elapsed:.1f}s")
+    for summary in sorted(summaries, key=lambda s: s["team"]):
+        if summary["skipped"]:
+            print(f"  {summary['team']:<16} worker {summary['worker']}  skipped, no new games")
+            continue
+        errors = f" (failed: {', '.join(summary['errors'])})" if summary["errors"] else ""
+        print(f"  {summary['team']:<16} worker {summary['worker']}  {summary['seconds']:>6}s  "
+              f"{summary['saved']} saved, {summary['empty']} empty, {len(summary['errors'])} errors{errors}")
+    print(f"Total: {sum(s['skipped'] for s in summaries)} skipped, "
+          f"{sum(s['saved'] for s in summaries)} saved, "
+          f"{sum(s['empty'] for s in summaries)} empty, "
+          f"{sum(len(s['errors']) for s in summaries)} errors.")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Scrape game-by-game Table 4 data from stats.ncaa.org.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of independent browser sessions; teams are sharded across them.")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread",
+                        help="Run the workers in a thread pool or a process pool.")
+    parser.add_argument("--backend", choices=["selenium", "http", "async"], default="selenium",
+                        help="Click through pages in Edge, or fetch category pages directly over HTTP "
+                             "(thread pool or asyncio).")
+    parser.add_argument("--base-url", default="https://stats.ncaa.org",
+                        help="Site root for the http/async backends (point at FixtureServer.py to run offline).")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Maximum simultaneous requests for the http/async backends.")
+    parser.add_argument("--rate", type=float, default=4.0,
+                        help="Requests per second allowed per host (async backend).")
+    parser.add_argument("--burst", type=int, default=4,
+                        help="Requests that may be sent back-to-back before --rate applies (async backend).")
+    parser.add_argument("--timeout", type=float, default=30,
+                        help="Per-request timeout in seconds (async backend).")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip teams with no new games and append only new games to the stored CSVs.")
+    parser.add_argument("--cache", nargs="?", const=CACHE_DIRECTORY, metavar="DIR",
+                        help=f"Read pages through an on-disk cache (default directory {CACHE_DIRECTORY}).")
+    parser.add_argument("--cache-ttl", type=float, default=6,
+                        help="Hours a cached page is used without revalidating it.")
+    parser.add_argument("--cache-max-mb", type=float, default=500,
+                        help="Size limit of the cache; least recently used pages are evicted.")
+    parser.add_argument("--replay", action="store_true",
+                        help="Re-parse every page from the cache without any network access.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Write TeamDataFiles/ CSVs or the partitioned TableStore/ columnar store.")
+    parser.add_argument("--save-html", metavar="DIR",
+                        help="Also save every fetched page to DIR (http/async backends) for FixtureServer.py.")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES,
+                        help="Rounds of retrying the (team, category) pairs that failed before dead-lettering them.")
+    parser.add_argument("--retry-backoff", type=float, default=RETRY_BACKOFF,
+                        help="Seconds before the first retry round; doubled for each later round.")
+    run_mode = parser.add_mutually_exclusive_group()
+    run_mode.add_argument("--resume", action="store_true",
+                          help="Continue the last session, fetching only the pairs it did not complete.")
+    run_mode.add_argument("--only-failed", action="store_true",
+                          help="Continue the last session, fetching only the pairs that failed or were dead-lettered.")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    link_texts = load_active_link_texts()
+    teams = load_active_teams()
+    manifest = load_manifest()
+
+    cache = None
+    if args.cache or args.replay:
+        cache = PageCache(args.cache or CACHE_DIRECTORY, ttl=args.cache_ttl * 3600,
+                          max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+    # Every (team, category) outcome is checkpointed in the journal as it happens. A plain run starts a new
+    # session; --resume fetches the units the last session did not finish, --only-failed just its failures
+    journal = ScrapeJournal()
+    if args.resume or args.only_failed:
+        if journal.session is None:
+            parser.error(f"No scrape session recorded in {journal.path} to resume")
+        if args.only_failed:
+            units = journal.units_with(("failed", "dead"), teams, link_texts)
+        else:
+            units = journal.remaining(teams, link_texts)
+        print(f"Continuing the session started {journal.session['session']}: "
+              f"{sum(len(unit_links) for unit_links in units.values())} unit(s) of {len(units)} team(s) to fetch")
+    else:
+        journal.start_session(sys.argv[1:] if argv is None else argv)
+        units = {team['name']: link_texts for team in teams}
+
+    # Per-stage and per-(team, category) timings, sizes and request counts go to the metrics log (Telemetry.py);
+    # units recorded inside process-pool workers stay in those processes
+    with Telemetry.run("ScrapeNCAA", argv) as telemetry:
+        started = time.perf_counter()
+        if args.replay and args.backend == "selenium":
+            # Replaying needs no browser; cached pages are read through the http backend's code path
+            args.backend = "http"
+        with telemetry.stage(f"scrape_{args.backend}"):
+            summaries = scrape_units(args, teams, units, manifest, cache, journal)
+        print_summary(summaries, time.perf_counter() - started)
+
+        # Retry queue: the units that failed in this run, in rounds with exponential backoff between them
+        journal.reload()
+        for attempt in range(1, args.retries + 1):
+            failed = journal.units_with(("failed",), teams, link_texts)
+            if not failed:
+                break
+            count = sum(len(unit_links) for unit_links in failed.values())
+            delay = args.retry_backoff * 2 ** (attempt - 1)
+            print(f"Retrying {count} failed unit(s) in {delay:.0f}s (round {attempt} of {args.retries})")
+            time.sleep(delay)
+            with telemetry.stage(f"retry_{attempt}"):
+                summaries += scrape_units(args, teams, failed, manifest, cache, journal)
+            journal.reload()
+            still_failed = journal.units_with(("failed",), teams, link_texts)
+            print(f"Round {attempt}: {count - sum(len(unit_links) for unit_links in still_failed.values())} of {count} "
+                  f"unit(s) recovered")
+
+        # Units still failing go to the dead-letter list; a later --only-failed run picks them up again
+        for team_name, unit_links in journal.units_with(("failed",), teams, link_texts).items():
+            for link_text in unit_links:
+                journal.dead(team_name, link_text, args.retries + 1)
+        print_journal(journal)
+
+        if cache is not None and args.backend != "selenium":
+            cache.save()
+            print(cache.stats())
+
+    # Record the game counts and row counts for the next incremental run, from the journal so the tables an
+    # interrupted earlier run of the session stored are included
+    save_manifest(update_manifest(manifest, journal.summaries()))
+    return summaries
 
-# Step 7: Close the Edge WebDriver
-driver.quit()
 
-# Output: Confirm WebDriver closure
-print("Edge WebDriver closed.")
+if __name__ == "__main__":
+    main()
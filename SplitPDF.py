@@ -1,5 +1,6 @@
 from PyPDF2 import PdfReader, PdfWriter
 import os
+import Telemetry
 
 
 def strip_quotes(path):
@@ -7,14 +8,17 @@ def strip_quotes(path):
 
 
 def split_pdf(input_pdf, start_page, end_page, output_pdf):
-    reader = PdfReader(input_pdf)
-    writer = PdfWriter()
+    # Pages copied are counted as the stage's rows
+    with Telemetry.current().stage("split_pdf") as stage:
+        reader = PdfReader(input_pdf)
+        writer = PdfWriter()
 
-    for i in range(start_page - 1, end_page):
-        writer.add_page(reader.pages[i])
+        for i in range(start_page - 1, end_page):
+            writer.add_page(reader.pages[i])
 
-    with open(output_pdf, 'wb') as output_file:
-        writer.write(output_file)
+        with open(output_pdf, 'wb') as output_file:
+            writer.write(output_file)
+        stage.add(rows=end_page - start_page + 1, bytes=os.path.getsize(input_pdf))
 
 
 if __name__ == "__main__":
@@ -24,5 +28,6 @@ if __name__ == "__main__":
     output_pdf = strip_quotes(input("Enter the name for the output PDF file: "))
 
     # Split the PDF
-    split_pdf(input_pdf, start_page, end_page, output_pdf)
+    with Telemetry.run("SplitPDF"):
+        split_pdf(input_pdf, start_page, end_page, output_pdf)
     print(f"Pages {start_page} to {end_page} have been split and saved as {output_pdf}")
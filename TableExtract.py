@@ -0,0 +1,108 @@
+from io import BytesIO
+
+try:
+    from lxml import etree
+except ImportError:  # lxml is optional; fall back to BeautifulSoup
+    etree = None
+
+from bs4 import BeautifulSoup
+
+
+def available_backends():
+    return ["lxml", "bs4"] if etree is not None else ["bs4"]
+
+
+def default_backend():
+    return available_backends()[0]
+
+
+def _rows_to_columns(headers, rows):
+    # Same contract as pd.DataFrame(rows, columns=headers): every row must match the header width
+    columns = [[] for _ in headers]
+    for row in rows:
+        if len(row) != len(headers):
+            raise ValueError(f"{len(headers)} columns passed, passed data had {len(row)} columns")
+        for column, value in zip(columns, row):
+            column.append(value)
+    return columns
+
+
+def _find_table_lxml(html, index):
+    # Stream the document and stop as soon as the target table is closed
+    source = BytesIO(html.encode("utf-8"))
+    seen = 0
+    target = None
+    for event, element in etree.iterparse(source, events=("start", "end"), tag="table",
+                                          html=True, encoding="utf-8", recover=True):
+        if event == "start":
+            if seen == index:
+                target = element
+            seen += 1
+        elif element is target:
+            return target
+    return None
+
+
+def _text(element):
+    # Equivalent of BeautifulSoup's .text.strip(): all descendant text, concatenated
+    return "".join(element.itertext()).strip()
+
+
+def _extract_lxml(table):
+    # One pass over the table's descendants, in document order
+    headers = []
+    rows = []
+    current_row = None
+    for element in table.iter("th", "td", "tr"):
+        if element.tag == "tr":
+            current_row = []
+            rows.append(current_row)
+        elif element.tag == "th":
+            headers.append(_text(element))
+        elif current_row is not None:
+            current_row.append(_text(element))
+    return headers, [row for row in rows if row]
+
+
+def _extract_bs4(table):
+    headers = [header.text.strip() for header in table.find_all('th')]
+    rows = []
+    for row in table.find_all('tr'):
+        row_data = [column.text.strip() for column in row.find_all('td')]
+        if row_data:  # Only keep rows with data
+            rows.append(row_data)
+    return headers, rows
+
+
+def extract_table_rows(html, index=3, backend=None):
+    """Return (headers, rows) for the table at position `index` (0-based), or None if the page has fewer tables."""
+    backend = backend or default_backend()
+    if backend == "lxml":
+        table = _find_table_lxml(html, index)
+        return None if table is None else _extract_lxml(table)
+
+    tables = BeautifulSoup(html, "html.parser").find_all("table")
+    return _extract_bs4(tables[index]) if len(tables) > index else None
+
+
+def extract_table(html, index=3, backend=None):
+    """Return (headers, columns) for the table at position `index`, with the cell text of each column as a list.
+
+    Returns None if the page has fewer tables. Rows without <td> cells (header rows) are skipped.
+    """
+    extracted = extract_table_rows(html, index=index, backend=backend)
+    if extracted is None:
+        return None
+    headers, rows = extracted
+    return headers, _rows_to_columns(headers, rows)
+
+
+def extract_all_tables(html, backend=None):
+    """Return (headers, rows) for every table on the page, in document order."""
+    backend = backend or default_backend()
+    if backend == "lxml":
+        document = etree.fromstring(html.encode("utf-8"), etree.HTMLParser(encoding="utf-8"))
+        tables = [] if document is None else document.iter("table")
+        return [_extract_lxml(table) for table in tables]
+
+    return [_extract_bs4(table) for table in BeautifulSoup(html, "html.parser").find_all("table")]
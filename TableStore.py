@@ -0,0 +1,138 @@
+import argparse
+import glob
+import os
+import numpy as np
+import pandas as pd
+from ScrapeCommon import OUTPUT_DIRECTORY, load_active_link_texts, load_active_teams, table_filename
+
+# Columnar store layout:
+#   TableStore/tables/season=2023/team=BYU/category=Rushing/part-0.parquet  (one scraped Table 4)
+#   TableStore/combined/team=BYU/part-0.parquet                             (one team's wide table)
+#   TableStore/combined/All_Teams_Combined.parquet                          (dashboard input)
+STORE_DIRECTORY = "TableStore"
+DATE_FORMAT = "%m/%d/%Y"
+
+
+def _partition_name(value):
+    return str(value).replace(' ', '_')
+
+
+def season_of(dates):
+    # Games from January onward (bowls, playoffs) belong to the season that started the previous fall
+    return np.where(dates.dt.month >= 3, dates.dt.year, dates.dt.year - 1)
+
+
+def type_table(df):
+    """Return a copy with Date as datetime and every column whose non-empty values are all numbers as
+    numeric, inferring int64/float64 from the text the same way pd.read_csv does for the CSV files.
+
+    Trailing '/' markers on stats.ncaa.org values (e.g. "55/") are removed first, as CombineAllTeamsData does.
+    """
+    typed = {}
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object:
+            values = values.where(values != "").str.rstrip('/')
+        if column == "Date":
+            typed[column] = pd.to_datetime(values, format=DATE_FORMAT)
+            continue
+        numeric = pd.to_numeric(values, errors="coerce")
+        typed[column] = numeric if numeric.notna().sum() == values.notna().sum() else values
+    return pd.DataFrame(typed, index=df.index)
+
+
+def category_path(season, team_name, link_text, store_directory=STORE_DIRECTORY):
+    return os.path.join(store_directory, "tables", f"season={season}", f"team={_partition_name(team_name)}",
+                        f"category={_partition_name(link_text)}", "part-0.parquet")
+
+
+def write_category_table(df, team_name, link_text, store_directory=STORE_DIRECTORY):
+    """Write a scraped category table (typed) into one partition per season; returns the paths written."""
+    typed = type_table(df)
+    paths = []
+    for season, season_df in typed.groupby(season_of(typed["Date"])):
+        path = category_path(season, team_name, link_text, store_directory)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        season_df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def read_category_table(team_name, link_text, seasons=None, store_directory=STORE_DIRECTORY):
+    # All seasons (or the given ones) of one team's category, oldest first; None if nothing is stored
+    pattern = category_path("*", team_name, link_text, store_directory)
+    paths = sorted(glob.glob(pattern))
+    if seasons is not None:
+        paths = [path for path in paths if any(f"season={season}" in path for season in seasons)]
+    if not paths:
+        return None
+    return pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+
+
+def combined_team_path(team_name, store_directory=STORE_DIRECTORY):
+    return os.path.join(store_directory, "combined", f"team={_partition_name(team_name)}", "part-0.parquet")
+
+
+def all_teams_path(store_directory=STORE_DIRECTORY):
+    return os.path.join(store_directory, "combined", "All_Teams_Combined.parquet")
+
+
+def write_frame(df, path):
+    # Parquet needs unique column names; CombineAllTeamsData repeats its derived columns with identical values
+    df = df.loc[:, ~df.columns.duplicated()].copy()
+
+    # Text columns can pick up numbers (e.g. fillna(0)); store them as text the way the CSV round-trip would
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].map(lambda x: None if pd.isna(x) else x if isinstance(x, str) else str(x))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path, index=False)
+    return path
+
+
+def all_teams_combined_path(store_directory=STORE_DIRECTORY, csv_directory=OUTPUT_DIRECTORY):
+    # The file read_all_teams_combined loads: whichever of the columnar store's file and the CSV file was
+    # written last, so a later build in either format reaches the dashboard
+    csv_path = os.path.join(csv_directory, "All_Teams_Combined.csv")
+    paths = [path for path in (all_teams_path(store_directory), csv_path) if os.path.exists(path)]
+    if not paths:
+        return csv_path
+    return max(paths, key=os.path.getmtime)
+
+
+def read_combined_file(path, columns=None):
+    # `columns` limits the read to those columns (the first copy of any repeated CSV column)
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    df = pd.read_csv(path, usecols=columns, parse_dates=['Date'])
+    return df[columns] if columns else df
+
+
+def read_all_teams_combined(store_directory=STORE_DIRECTORY, csv_directory=OUTPUT_DIRECTORY):
+    """Load the all-teams table for the dashboard from the more recently written of the columnar store's
+    file and the CSV file."""
+    return read_combined_file(all_teams_combined_path(store_directory, csv_directory))
+
+
+def import_csv_tables(output_directory=OUTPUT_DIRECTORY, store_directory=STORE_DIRECTORY):
+    # One-off migration of the existing per-team category CSVs into the columnar store
+    count = 0
+    for team in load_active_teams():
+        for link_text in load_active_link_texts():
+            filepath = os.path.join(output_directory, table_filename(team['name'], link_text))
+            if os.path.exists(filepath):
+                df = pd.read_csv(filepath, dtype=str, keep_default_na=False)
+                write_category_table(df, team['name'], link_text, store_directory)
+                count += 1
+    print(f"Imported {count} category tables into {store_directory}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the TableStore/ columnar store.")
+    parser.add_argument("--import-csv", action="store_true",
+                        help="Load the existing TeamDataFiles/ category CSVs into the store.")
+    args = parser.parse_args()
+
+    if args.import_csv:
+        import_csv_tables()
+    else:
+        parser.print_help()
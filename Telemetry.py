@@ -0,0 +1,228 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from ScrapeCommon import OUTPUT_DIRECTORY
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is then left out
+    resource = None
+
+# One JSON line per run of a script
+METRICS_LOG_PATH = os.path.join(OUTPUT_DIRECTORY, "metrics_log.jsonl")
+
+# Set FOOTBALL_TRACE_MEMORY=1 to also record each stage's peak Python allocation (slows allocation-heavy code)
+TRACE_MEMORY = os.environ.get("FOOTBALL_TRACE_MEMORY") == "1"
+
+COUNTERS = ("rows", "bytes", "requests")
+
+
+def peak_rss_mb():
+    # High-water mark of the process's resident memory so far (ru_maxrss is KiB on Linux, bytes on macOS)
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Metrics:
+    """Counters and timings of one stage or one (team, category) unit of work."""
+
+    def __init__(self, **fields):
+        self.fields = dict(fields, rows=0, bytes=0, requests=0)
+        self.lock = threading.Lock()
+
+    def add(self, **counts):
+        # Stage totals are updated from worker threads, so additions are locked
+        with self.lock:
+            for name, value in counts.items():
+                self.fields[name] = self.fields.get(name, 0) + (value or 0)
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __getitem__(self, name):
+        return self.fields[name]
+
+
+class TelemetryRun:
+    """Stages and units recorded by one run of a script, appended to the metrics log when it ends.
+
+    Units (one team's category, or one team) can be recorded from any thread; their rows, bytes and requests
+    are also added to every stage open at the time. When `enabled` is False nothing is kept, so library code
+    can record unconditionally.
+    """
+
+    def __init__(self, script, argv=None, enabled=True, trace_memory=TRACE_MEMORY):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.record = {"run_id": uuid.uuid4().hex[:12], "script": script, "argv": list(argv or []),
+                       "started": datetime.now().isoformat(timespec="seconds"), "status": "running",
+                       "stages": [], "units": []}
+        self.open_stages = []
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block: wall and CPU seconds (the whole process, all threads), peak RSS after it and, when
+        tracing, its peak Python allocation. Yields the stage's Metrics for rows/bytes/requests."""
+        metrics = Metrics(stage=name, depth=len(self.open_stages), status="ok")
+        if self.trace_memory and self.enabled:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        if self.enabled:
+            # Listed in the order the stages start; the fields are filled in when the stage ends
+            self.open_stages.append(metrics)
+            with self.lock:
+                self.record["stages"].append(metrics.fields)
+        try:
+            yield metrics
+        except BaseException:
+            metrics.set(status="failed")
+            raise
+        finally:
+            metrics.set(seconds=round(time.perf_counter() - started, 4),
+                        cpu_seconds=round(time.process_time() - cpu_started, 4), peak_rss_mb=peak_rss_mb())
+            if self.trace_memory and self.enabled:
+                metrics.set(traced_peak_mb=round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1))
+            if self.enabled:
+                self.open_stages.remove(metrics)
+
+    @contextlib.contextmanager
+    def unit(self, team, category=None):
+        """Time one team's category (or the whole team when `category` is None). Yields its Metrics."""
+        metrics = Metrics(team=team, category=category, status="ok")
+        started = time.perf_counter()
+        try:
+            yield metrics
+        except BaseException:
+            metrics.set(status="failed")
+            raise
+        finally:
+            metrics.set(seconds=round(time.perf_counter() - started, 4))
+            if self.enabled:
+                with self.lock:
+                    self.record["units"].append(metrics.fields)
+                for stage in list(self.open_stages):
+                    stage.add(**{name: metrics[name] for name in COUNTERS})
+
+    def finish(self, status="ok"):
+        self.record.update(status=status, seconds=round(time.perf_counter() - self.started, 4),
+                           cpu_seconds=round(time.process_time() - self.cpu_started, 4), peak_rss_mb=peak_rss_mb())
+        return self.record
+
+
+# The run in progress in this process, if any; a disabled run otherwise
+_current = None
+_disabled = TelemetryRun(None, enabled=False)
+
+
+def current():
+    return _current or _disabled
+
+
+@contextlib.contextmanager
+def run(script, argv=None, log_path=METRICS_LOG_PATH):
+    """Record a run of `script` and append it to `log_path` when it ends (also when it fails).
+
+    Inside a run already in progress (e.g. ScrapeNCAA.main called by main.py), the outer run is reused and
+    the records go to its log line.
+    """
+    global _current
+    if _current is not None:
+        yield _current
+        return
+
+    _current = TelemetryRun(script, sys.argv[1:] if argv is None else argv)
+    status = "failed"
+    try:
+        yield _current
+        status = "ok"
+    finally:
+        record = _current.finish(status)
+        _current = None
+        append_run(record, log_path)
+
+
+def append_run(record, log_path=METRICS_LOG_PATH):
+    os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_runs(log_path=METRICS_LOG_PATH):
+    if not os.path.exists(log_path):
+        return []
+    with open(log_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def format_mb(value):
+    return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+
+def print_run(record, slowest_units=0):
+    print(f"\n{record['started']}  {record['script']} {' '.join(record['argv'])}  [{record['status']}]  "
+          f"{record.get('seconds', 0):.2f}s wall, {record.get('cpu_seconds', 0):.2f}s CPU, "
+          f"peak RSS {record.get('peak_rss_mb') or '-'} MiB")
+    if record["stages"]:
+        print(f"  {'stage':<24} {'wall s':>8} {'CPU s':>8} {'RSS MiB':>8} {'trace MiB':>9} {'rows':>9} "
+              f"{'MiB':>8} {'requests':>8}")
+    for stage in record["stages"]:
+        name = "  " * stage.get("depth", 0) + stage["stage"]
+        if stage["status"] != "ok":
+            name += f" ({stage['status']})"
+        print(f"  {name:<24} {stage['seconds']:>8.2f} {stage['cpu_seconds']:>8.2f} "
+              f"{format_mb(stage.get('peak_rss_mb'))} {format_mb(stage.get('traced_peak_mb')):>9} {stage['rows']:>9} "
+              f"{stage['bytes'] / 1024 / 1024:>8.2f} {stage['requests']:>8}")
+    if slowest_units and record["units"]:
+        print(f"  Slowest of {len(record['units'])} unit(s):")
+        for unit in sorted(record["units"], key=lambda unit: -unit["seconds"])[:slowest_units]:
+            category = unit['category'] or '-'
+            print(f"    {unit['team']:<16} {category:<24} {unit['seconds']:>7.3f}s {unit['rows']:>6} rows "
+                  f"{unit['bytes'] / 1024:>8.1f} KiB {unit['requests']:>3} req  {unit['status']}")
+
+
+def print_trends(runs):
+    # Each stage's wall time and peak RSS across the runs, oldest first
+    stages = {}
+    for record in runs:
+        for stage in record["stages"]:
+            stages.setdefault((record["script"], stage["stage"]), []).append(stage)
+    print(f"\n{'script / stage':<48} {'runs':>4} {'last s':>8} {'mean s':>8} {'min s':>8} {'max RSS MiB':>11}")
+    for (script, name), rows in stages.items():
+        seconds = [row["seconds"] for row in rows]
+        rss = [row["peak_rss_mb"] for row in rows if row.get("peak_rss_mb") is not None]
+        print(f"{script + ' / ' + name:<48} {len(rows):>4} {seconds[-1]:>8.2f} {sum(seconds) / len(seconds):>8.2f} "
+              f"{min(seconds):>8.2f} {format_mb(max(rss) if rss else None):>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the runs recorded in the metrics log.")
+    parser.add_argument("--log", default=METRICS_LOG_PATH, help="Metrics log to read.")
+    parser.add_argument("--last", type=int, default=5, help="Show the last N runs.")
+    parser.add_argument("--script", help="Only runs of this script (e.g. ScrapeNCAA, main).")
+    parser.add_argument("--units", type=int, default=10, metavar="N",
+                        help="Show each run's N slowest (team, category) units (0 for none).")
+    parser.add_argument("--trends", action="store_true", help="Also compare each stage across all the runs.")
+    args = parser.parse_args()
+
+    runs = [record for record in load_runs(args.log) if not args.script or record["script"] == args.script]
+    if not runs:
+        print(f"No runs recorded in {args.log}")
+        sys.exit(0)
+    for record in runs[-args.last:]:
+        print_run(record, args.units)
+    if args.trends:
+        print_trends(runs)
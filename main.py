@@ -1,16 +1,151 @@
-import subprocess
-
-# Step 1: Run ScrapeNCAA.py
-print("Running ScrapeNCAA.py...")
-subprocess.run(["python", "ScrapeNCAA.py"], check=True)
-print("Finished running ScrapeNCAA.py")
-
-# Step 2: Run CombineIndividualTeamFiles.py
-print("Running CombineIndividualTeamFiles.py...")
-subprocess.run(["python", "CombineIndividualTeamFiles.py"], check=True)
-print("Finished running CombineIndividualTeamFiles.py")
-
-# Step 3: Run CombineAllTeamsData.py
-print("Running CombineAllTeamsData.py...")
-subprocess.run(["python", "CombineAllTeamsData.py"], check=True)
-print("Finished running CombineAllTeamsData.py")
+import argparse
+import glob
+import os
+import pandas as pd
+from CombineAllTeamsData import combine_team_frames
+import CombineIndividualTeamFiles
+from IncrementalCombine import (COMBINE_MANIFEST_PATH, DERIVE_FILES, MERGE_FILES, combine_all_incremental,
+                                combine_teams_incremental, load_combine_manifest, save_combine_manifest)
+from PipelineRunner import PipelineRunner, Stage, print_report
+from ScrapeCommon import OUTPUT_DIRECTORY, combined_filename, load_active_link_texts, load_active_teams, table_filename
+import TableStore
+import Telemetry
+
+CONFIG_FILES = ["teams.csv", "link_texts.csv"]
+ALL_TEAMS_PATH = os.path.join(OUTPUT_DIRECTORY, "All_Teams_Combined.csv")
+
+
+def active_team_names():
+    return [team['name'] for team in load_active_teams()]
+
+
+def table_paths():
+    # Every category table of the active teams and links (missing ones count as inputs too)
+    link_texts = load_active_link_texts()
+    return [os.path.join(OUTPUT_DIRECTORY, table_filename(team_name, link_text))
+            for team_name in active_team_names() for link_text in link_texts]
+
+
+def combined_paths():
+    return [os.path.join(OUTPUT_DIRECTORY, combined_filename(team_name)) for team_name in active_team_names()]
+
+
+def store_table_paths():
+    # Every season partition of the active teams' category tables in the columnar store
+    link_texts = load_active_link_texts()
+    return sorted(path for team_name in active_team_names() for link_text in link_texts
+                  for path in glob.glob(TableStore.category_path("*", team_name, link_text)))
+
+
+def store_combined_paths():
+    return [TableStore.combined_team_path(team_name) for team_name in active_team_names()]
+
+
+def load_store_combined():
+    return {team_name: pd.read_parquet(path) for team_name, path in zip(active_team_names(), store_combined_paths())
+            if os.path.exists(path)}
+
+
+def scrape(upstream, scrape_args):
+    # Imported here so the combine stages can run without Selenium installed
+    import ScrapeNCAA
+    return ScrapeNCAA.main(scrape_args)
+
+
+def combine_teams(upstream, full=False):
+    # Only teams whose category tables changed are merged again (every team with full=True); their frames
+    # go to combine_all in memory
+    manifest = {"teams": {}} if full else load_combine_manifest()
+    rebuilt = combine_teams_incremental(load_active_teams(), load_active_link_texts(), manifest)
+    save_combine_manifest(manifest)
+    return rebuilt
+
+
+def combine_all(upstream):
+    # Recompute the derived metrics of changed teams and restack them with the cached rows of the others
+    manifest = load_combine_manifest()
+    combined_df, recomputed = combine_all_incremental(active_team_names(), manifest,
+                                                      frames=upstream["combine_teams"], output_path=ALL_TEAMS_PATH)
+    save_combine_manifest(manifest)
+    if combined_df is None:
+        print(f"{ALL_TEAMS_PATH} is up to date.")
+        return None
+    print(f"All teams combined file saved as {ALL_TEAMS_PATH} with shape {combined_df.shape}; "
+          f"recomputed {len(recomputed)} team(s)")
+    return combined_df
+
+
+def combine_teams_store(upstream):
+    # The columnar store has no incremental combine; every active team is merged again
+    return CombineIndividualTeamFiles.combine_teams(load_active_teams(), load_active_link_texts(), fmt="parquet")
+
+
+def combine_all_store(upstream):
+    frames = upstream["combine_teams"]
+    combined_df = combine_team_frames([frames[team_name] for team_name in active_team_names() if team_name in frames])
+    if combined_df is None:
+        print("No active team tables found to combine.")
+        return None
+    output_path = TableStore.write_frame(combined_df, TableStore.all_teams_path())
+    print(f"All teams combined file saved as {output_path} with shape {combined_df.shape}")
+    return combined_df
+
+
+def build_stages(scrape_args, skip_scrape=False, full=False, fmt="csv"):
+    stages = [] if skip_scrape else [
+        Stage("scrape", lambda upstream: scrape(upstream, scrape_args + ["--format", fmt]), config=CONFIG_FILES,
+              volatile=True),
+    ]
+    if fmt == "parquet":
+        # Same stages over TableStore/: the scraper writes the store and the combine stages read it
+        return stages + [
+            Stage("combine_teams", combine_teams_store, after=[] if skip_scrape else ["scrape"],
+                  inputs=store_table_paths, config=CONFIG_FILES + MERGE_FILES, outputs=store_combined_paths,
+                  load=load_store_combined),
+            Stage("combine_all", combine_all_store, after=["combine_teams"], config=CONFIG_FILES + DERIVE_FILES,
+                  outputs=lambda: [TableStore.all_teams_path()]),
+        ]
+    stages += [
+        # combine_teams reads the category tables from disk rather than taking them from the scrape: with
+        # --incremental the scrape only holds the new games it appended, a --resume run holds only the tables it
+        # fetched, and process-pool workers never hand their frames back. A skipped combine_teams rebuilt no
+        # teams, so combine_all gets no frames from it
+        Stage("combine_teams", lambda upstream: combine_teams(upstream, full),
+              after=[] if skip_scrape else ["scrape"], inputs=table_paths, config=CONFIG_FILES + MERGE_FILES,
+              outputs=lambda: combined_paths() + [COMBINE_MANIFEST_PATH],
+              load=dict),
+        Stage("combine_all", combine_all, after=["combine_teams"], config=CONFIG_FILES + DERIVE_FILES,
+              outputs=lambda: [ALL_TEAMS_PATH]),
+    ]
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scrape, combine each team's tables and build All_Teams_Combined.csv in one process. "
+                    "Other options (e.g. --backend http --incremental) are passed on to ScrapeNCAA.py.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Scrape into and combine from TeamDataFiles/ CSVs or the TableStore/ columnar store.")
+    parser.add_argument("--skip-scrape", action="store_true", help="Only run the combine stages.")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="Run STAGE even if its inputs are unchanged (repeatable; 'all' for every stage).")
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild every team instead of only those whose tables changed (implies --force all).")
+    args, scrape_args = parser.parse_known_args()
+    if args.skip_scrape and scrape_args:
+        parser.error(f"unrecognized arguments: {' '.join(scrape_args)} (scraper options need the scrape stage)")
+    if not args.skip_scrape:
+        # Check the scraper's options now, so a typo fails before any stage runs
+        import ScrapeNCAA
+        ScrapeNCAA.build_parser().parse_args(scrape_args + ["--format", args.format])
+
+    # One metrics log line for the whole run, with a telemetry stage per pipeline stage that ran
+    runner = PipelineRunner(build_stages(scrape_args, skip_scrape=args.skip_scrape, full=args.full,
+                                         fmt=args.format))
+    with Telemetry.run("main"):
+        report = runner.run(force=args.force + (["all"] if args.full else []))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
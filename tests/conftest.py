@@ -0,0 +1,43 @@
+import os
+import sys
+import pytest
+
+# The modules live at the top of the repository and read teams.csv, link_texts.csv and TeamDataFiles/
+# relative to it
+REPO_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIRECTORY)
+
+
+@pytest.fixture(scope="session")
+def fixture_pages(tmp_path_factory):
+    """Synthetic team and category pages (2 teams x 4 categories) in a directory FixtureServer.py serves.
+
+    Returns (directory, tables): tables maps (team, link text) to the generated table.
+    """
+    from Benchmarks.SyntheticData import generate, write_fixture_pages
+    directory = str(tmp_path_factory.mktemp("pages"))
+    cwd = os.getcwd()
+    os.chdir(REPO_DIRECTORY)
+    try:
+        tables = generate(teams=2, seasons=1, categories=4, seed=1)
+    finally:
+        os.chdir(cwd)
+    write_fixture_pages(tables, directory)
+    return directory, tables
+
+
+@pytest.fixture
+def serve(fixture_pages):
+    """Start a FixtureServer on the fixture pages, optionally with Faults; returns its base URL."""
+    from FixtureServer import start_server
+    servers = []
+
+    def start(faults=None):
+        server = start_server(fixture_pages[0], faults=faults)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import os
+import aiohttp
+import pandas as pd
+import pytest
+from AsyncScrape import RateLimitedClient
+from FixtureServer import Faults
+from HttpScrape import saved_page_filename, team_url
+from PageCache import PageCache
+
+
+def read_page(directory, team_id):
+    with open(os.path.join(directory, saved_page_filename(team_id)), encoding="utf-8") as f:
+        return f.read()
+
+
+def team_ids(directory):
+    return pd.read_csv(os.path.join(directory, "teams.csv"))["id"].tolist()
+
+
+async def fetch_all(urls, rate=100.0, burst=10, backoff=0.01, cache=None, headers=None):
+    async with aiohttp.ClientSession(headers=headers) as session:
+        client = RateLimitedClient(session, rate=rate, burst=burst, concurrency=8, backoff=backoff, cache=cache)
+        pages = await asyncio.gather(*[client.fetch(url) for url in urls])
+    return pages, client.request_count
+
+
+def test_retries_throttled_and_failed_requests(fixture_pages, serve):
+    directory, _ = fixture_pages
+    faults = Faults(throttle=1, errors=1, retry_after=1)
+    team_id = team_ids(directory)[0]
+    url = team_url(team_id, serve(faults))
+
+    (html,), requests_sent = asyncio.run(fetch_all([url]))
+
+    assert html == read_page(directory, team_id)
+    assert requests_sent == 3
+    assert [status for _, _, status in faults.requests] == [429, 503, 200]
+    # The 429's Retry-After (1s) is waited out although the client's own backoff is 0.01s
+    times = [requested for requested, _, _ in faults.requests]
+    assert times[1] - times[0] >= 0.9
+    assert times[2] - times[1] < 0.9
+
+
+def test_gives_up_after_the_retries(fixture_pages, serve):
+    directory, _ = fixture_pages
+    faults = Faults(errors=10)
+    url = team_url(team_ids(directory)[0], serve(faults))
+
+    with pytest.raises(aiohttp.ClientResponseError) as error:
+        asyncio.run(fetch_all([url]))
+    assert error.value.status == 503
+    assert len(faults.requests) == 4  # The first request and three retries
+
+
+def test_token_bucket_limits_the_request_rate(fixture_pages, serve):
+    directory, _ = fixture_pages
+    faults = Faults()
+    base_url = serve(faults)
+    rate, burst = 20.0, 3
+    urls = [f"{team_url(team_id, base_url)}?n={number}" for number in range(8) for team_id in team_ids(directory)]
+
+    asyncio.run(fetch_all(urls, rate=rate, burst=burst))
+
+    times = sorted(requested for requested, _, _ in faults.requests)
+    assert len(times) == len(urls)
+    # No more than the burst at once, then `rate` per second (a little slack for the server's clock)
+    for number, requested in enumerate(times):
+        assert number + 1 <= burst + (requested - times[0]) * rate + 1
+    assert times[-1] - times[0] >= (len(urls) - burst) / rate * 0.9
+
+
+def test_revalidates_a_stale_cached_page(fixture_pages, serve, tmp_path):
+    directory, _ = fixture_pages
+    faults = Faults()
+    team_id = team_ids(directory)[0]
+    url = team_url(team_id, serve(faults))
+    cache = PageCache(str(tmp_path / "cache"), ttl=0)
+
+    (first,), _ = asyncio.run(fetch_all([url], cache=cache))
+    (second,), _ = asyncio.run(fetch_all([url], cache=cache))
+
+    assert first == second == read_page(directory, team_id)
+    assert [status for _, _, status in faults.requests] == [200, 304]
+    assert cache.revalidated == 1
+
+
+def test_not_modified_without_a_cached_page_is_an_error(fixture_pages, serve):
+    directory, _ = fixture_pages
+    base_url = serve()
+    team_id = team_ids(directory)[0]
+    (html,), _ = asyncio.run(fetch_all([team_url(team_id, base_url)]))
+
+    # A conditional request the client did not make itself gets a 304 with no cache entry to fall back on
+    etag = f'"{hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]}"'
+    with pytest.raises(aiohttp.ClientResponseError) as error:
+        asyncio.run(fetch_all([team_url(team_id, base_url)], headers={"If-None-Match": etag}))
+    assert error.value.status == 304
@@ -0,0 +1,38 @@
+import os
+import shutil
+import pandas as pd
+import pytest
+from CombineAllTeamsData import combine_team_frames
+from CombineEngine import combine_directory, verify_against
+from CombineIndividualTeamFiles import combine_teams
+from conftest import REPO_DIRECTORY
+from ScrapeCommon import load_active_link_texts
+
+# BYU's and Utah's category tables and the All_Teams_Combined.csv the two-script pipeline makes from them
+FIXTURE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "combine")
+GOLDEN_PATH = os.path.join(FIXTURE_DIRECTORY, "All_Teams_Combined.csv")
+TEAM_NAMES = ["BYU", "Utah"]
+
+
+@pytest.fixture(autouse=True)
+def repo_directory(monkeypatch):
+    # link_texts.csv, MetricDefinitions.csv and StatList.csv are read relative to the repository
+    monkeypatch.chdir(REPO_DIRECTORY)
+
+
+def test_engine_matches_golden_file():
+    combined_df = combine_directory(FIXTURE_DIRECTORY, TEAM_NAMES, load_active_link_texts())
+    assert verify_against(combined_df, GOLDEN_PATH), f"engine output written to {GOLDEN_PATH}.engine"
+
+
+def test_two_script_pipeline_matches_golden_file(tmp_path):
+    # CombineIndividualTeamFiles then CombineAllTeamsData, as the legacy scripts run them
+    link_texts = load_active_link_texts()
+    for filename in os.listdir(FIXTURE_DIRECTORY):
+        if filename.endswith("_Table_4.csv"):
+            shutil.copy(os.path.join(FIXTURE_DIRECTORY, filename), tmp_path / filename)
+    frames = combine_teams([{"name": team_name} for team_name in TEAM_NAMES], link_texts,
+                           output_directory=str(tmp_path))
+    combined_df = combine_team_frames([pd.read_csv(tmp_path / f"{team_name}_Combined.csv")
+                                       for team_name in sorted(frames, key=str.lower)])
+    assert verify_against(combined_df, GOLDEN_PATH)
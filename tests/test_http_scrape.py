@@ -0,0 +1,34 @@
+import os
+import pandas as pd
+from HttpScrape import resolve_category_ids, saved_page_filename, scrape_teams_http
+from ScrapeCommon import OUTPUT_DIRECTORY, parse_table_4, table_filename
+
+
+def read_page(directory, team_id, category_id=None):
+    with open(os.path.join(directory, saved_page_filename(team_id, category_id)), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_scrapes_fixture_pages(fixture_pages, serve, tmp_path, monkeypatch):
+    directory, tables = fixture_pages
+    teams = pd.read_csv(os.path.join(directory, "teams.csv")).to_dict(orient="records")
+    link_texts = pd.read_csv(os.path.join(directory, "link_texts.csv"))["link_text"].tolist()
+    base_url = serve()
+
+    # Tables are written under ./TeamDataFiles, so run in an empty directory
+    monkeypatch.chdir(tmp_path)
+    summaries = scrape_teams_http(teams, link_texts, base_url=base_url, concurrency=4, log=lambda message: None)
+
+    assert [summary["saved"] for summary in summaries] == [len(link_texts)] * len(teams)
+    assert all(not summary["errors"] for summary in summaries)
+    for team in teams:
+        # Category ids come from the links on the team page
+        category_ids = resolve_category_ids(read_page(directory, team["id"]), link_texts)
+        assert category_ids == {link_text: str(20000 + number) for number, link_text in enumerate(link_texts)}
+
+        for link_text, category_id in category_ids.items():
+            expected = parse_table_4(read_page(directory, team["id"], category_id), team["name"], link_text)
+            written = pd.read_csv(os.path.join(OUTPUT_DIRECTORY, table_filename(team["name"], link_text)),
+                                  dtype=str, keep_default_na=False)
+            pd.testing.assert_frame_equal(written, expected.astype(str), check_dtype=False)
+            assert len(written) == len(tables[(team["name"], link_text)])